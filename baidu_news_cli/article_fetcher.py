@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+新闻正文抓取模块
+并发下载新闻文章页面，按主机限制连接数，限制响应大小，
+流式解码字符集并提取正文，结果按规范化URL缓存
+"""
+
+import codecs
+import re
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bs4 import BeautifulSoup
+
+from http_utils import HostLimiter, PublicOnlyAdapter, canonicalize_url, check_public_url
+
+# 用于探测<meta>字符集声明的字节数
+SNIFF_BYTES = 4096
+
+# 最多跟随的跳转次数
+MAX_REDIRECTS = 5
+
+# 常见的中文字符集别名，统一使用超集解码
+CHARSET_ALIASES = {
+    "gb2312": "gb18030",
+    "gbk": "gb18030",
+    "x-gbk": "gb18030",
+}
+
+# 不属于正文的标签
+NOISE_TAGS = ["script", "style", "noscript", "iframe", "nav", "header", "footer", "aside", "form"]
+
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?\s*([a-zA-Z0-9_\-]+)', re.I)
+
+
+def _normalize_charset(charset):
+    """
+    规范化字符集名称，无法识别时返回None
+
+    Args:
+        charset (str): 字符集名称
+
+    Returns:
+        str: Python可用的编码名称
+    """
+    if not charset:
+        return None
+    charset = charset.strip().strip('"\'').lower()
+    charset = CHARSET_ALIASES.get(charset, charset)
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return None
+    return charset
+
+
+def _sniff_charset(prefix):
+    """
+    从页面开头的<meta>声明中探测字符集，探测不到时使用UTF-8
+
+    Args:
+        prefix (bytes): 页面开头的字节
+
+    Returns:
+        str: 编码名称
+    """
+    match = META_CHARSET_PATTERN.search(prefix)
+    if match:
+        charset = _normalize_charset(match.group(1).decode('ascii', 'ignore'))
+        if charset:
+            return charset
+    return "utf-8"
+
+
+def extract_main_text(html_content):
+    """
+    从文章页面中提取标题和正文
+
+    以段落(<p>)文本最多的容器作为正文区域，找不到时退回整个<body>的文本
+
+    Args:
+        html_content (str): HTML内容
+
+    Returns:
+        tuple: (标题, 正文)
+    """
+    soup = BeautifulSoup(html_content, 'lxml')
+
+    title = ""
+    og_title = soup.find('meta', attrs={'property': 'og:title'})
+    if og_title and og_title.get('content'):
+        title = og_title['content'].strip()
+    elif soup.title and soup.title.string:
+        title = soup.title.string.strip()
+
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+
+    # 统计每个容器直接包含的段落文本长度
+    best_container = None
+    best_score = 0
+    scores = {}
+    for paragraph in soup.find_all('p'):
+        text_length = len(paragraph.get_text(strip=True))
+        if text_length < 10:
+            continue
+        parent = paragraph.parent
+        if parent is None:
+            continue
+        score = scores.get(id(parent), 0) + text_length
+        scores[id(parent)] = score
+        if score > best_score:
+            best_score = score
+            best_container = parent
+
+    if best_container is not None:
+        paragraphs = [
+            p.get_text(strip=True)
+            for p in best_container.find_all('p')
+            if p.get_text(strip=True)
+        ]
+        text = "\n".join(paragraphs)
+    else:
+        body = soup.body or soup
+        text = "\n".join(line.strip() for line in body.get_text("\n").splitlines() if line.strip())
+
+    return title, text
+
+
+class ArticleFetcher:
+    """新闻正文抓取器"""
+
+    def __init__(self, timeout=10, max_workers=8, per_host_limit=2, max_bytes=2 * 1024 * 1024, cache_size=1024):
+        """
+        初始化抓取器
+
+        Args:
+            timeout (int): 请求超时时间（秒）
+            max_workers (int): 最大并发下载数
+            per_host_limit (int): 每个主机的最大并发连接数
+            max_bytes (int): 单个页面最多读取的字节数，超过部分被截断
+            cache_size (int): 最多缓存的文章数，超出时淘汰最久未使用的文章
+        """
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.max_bytes = max_bytes
+        self.cache_size = cache_size
+        self.host_limiter = HostLimiter(per_host_limit)
+
+        self.session = requests.Session()
+        # URL可能来自MCP工具的调用方，只允许连接公网地址
+        adapter = PublicOnlyAdapter(pool_connections=self.max_workers, pool_maxsize=per_host_limit)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        })
+
+        # 规范化URL -> 抓取结果，按最近使用顺序排列
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _download(self, url, user_agent=None):
+        """
+        流式下载并解码页面
+
+        只请求公网的http/https地址，跳转目标在跟随之前同样会被检查
+
+        Args:
+            url (str): 文章URL
+            user_agent (str): 请求使用的User-Agent
+
+        Returns:
+            tuple: (解码后的HTML, 最终URL, 字符集, 是否被截断)
+
+        Raises:
+            UnsafeURLError: URL或跳转目标不允许访问
+        """
+        headers = {"User-Agent": user_agent} if user_agent else None
+        for _ in range(MAX_REDIRECTS + 1):
+            check_public_url(url)
+            # 每一跳分别占用所请求主机的并发名额，跳转链接所在的主机不会限制最终文章的下载
+            with self.host_limiter.limit(url):
+                response = self.session.get(url, headers=headers, timeout=self.timeout,
+                                            stream=True, allow_redirects=False)
+                try:
+                    if response.is_redirect:
+                        url = urllib.parse.urljoin(url, response.headers["Location"])
+                        continue
+                    response.raise_for_status()
+                    html_content, charset, truncated = self._read_body(response)
+                    return html_content, response.url, charset, truncated
+                finally:
+                    response.close()
+        raise requests.TooManyRedirects(f"跳转次数过多: {url}")
+
+    def _read_body(self, response):
+        """
+        流式读取并解码响应正文，最多读取 max_bytes 字节
+
+        Args:
+            response (requests.Response): 以stream=True发出的请求的响应
+
+        Returns:
+            tuple: (解码后的HTML, 字符集, 是否被截断)
+        """
+        # 优先使用响应头声明的字符集
+        charset = None
+        if 'charset=' in response.headers.get('Content-Type', '').lower():
+            charset = _normalize_charset(response.encoding)
+        decoder = None
+        prefix = b""
+        parts = []
+        received = 0
+        truncated = False
+
+        for chunk in response.iter_content(chunk_size=16 * 1024):
+            if not chunk:
+                continue
+            if received + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - received]
+                truncated = True
+            received += len(chunk)
+
+            if decoder is None:
+                # 响应头没有声明字符集时，先缓存开头部分用于探测<meta>声明
+                prefix += chunk
+                if charset is None and len(prefix) < SNIFF_BYTES and not truncated:
+                    continue
+                charset = charset or _sniff_charset(prefix)
+                decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+                chunk, prefix = prefix, b""
+
+            parts.append(decoder.decode(chunk))
+            if truncated:
+                break
+
+        if decoder is None:
+            # 页面短于探测长度
+            charset = charset or _sniff_charset(prefix)
+            decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+            parts.append(decoder.decode(prefix))
+        if not truncated:
+            # 截断时丢弃末尾不完整的多字节字符，而不是解码为替换字符
+            parts.append(decoder.decode(b"", final=True))
+
+        return "".join(parts), charset, truncated
+
+    def fetch(self, url, user_agent=None):
+        """
+        抓取单篇文章，命中缓存时直接返回
+
+        Args:
+            url (str): 文章URL
+            user_agent (str): 请求使用的User-Agent
+
+        Returns:
+            dict: 包含url、canonical_url、final_url、title、text、charset、truncated、error的字典
+        """
+        canonical_url = canonicalize_url(url)
+        with self._cache_lock:
+            cached = self._cache.get(canonical_url)
+            if cached is not None:
+                self._cache.move_to_end(canonical_url)
+        if cached is not None:
+            return dict(cached, url=url)
+
+        try:
+            html_content, final_url, charset, truncated = self._download(url, user_agent)
+            title, text = extract_main_text(html_content)
+        except Exception as e:
+            return {
+                'url': url,
+                'canonical_url': canonical_url,
+                'final_url': '',
+                'title': '',
+                'text': '',
+                'charset': '',
+                'truncated': False,
+                'error': f"抓取文章失败: {str(e)}",
+            }
+
+        article = {
+            'url': url,
+            'canonical_url': canonical_url,
+            'final_url': final_url,
+            'title': title,
+            'text': text,
+            'charset': charset,
+            'truncated': truncated,
+            'error': None,
+        }
+        # 只缓存成功的结果，失败的URL下次仍会重新抓取
+        with self._cache_lock:
+            self._cache[canonical_url] = article
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return article
+
+    def fetch_many(self, urls, user_agent_factory=None):
+        """
+        并发抓取多篇文章
+
+        同一批次中规范化后相同的URL只下载一次
+
+        Args:
+            urls (list): 文章URL列表
+            user_agent_factory (callable): 每次请求调用一次以获取User-Agent
+
+        Returns:
+            list: 与urls顺序一致的抓取结果列表
+        """
+        unique_urls = {}
+        for url in urls:
+            unique_urls.setdefault(canonicalize_url(url), url)
+
+        def task(url):
+            user_agent = user_agent_factory() if user_agent_factory else None
+            return self.fetch(url, user_agent)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            fetched = dict(zip(unique_urls, executor.map(task, unique_urls.values())))
+
+        return [dict(fetched[canonicalize_url(url)], url=url) for url in urls]
+
+    def clear_cache(self):
+        """清空文章缓存"""
+        with self._cache_lock:
+            self._cache.clear()
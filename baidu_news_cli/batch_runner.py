@@ -0,0 +1,408 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+批量关键词任务模块
+把全部关键词的 (关键词, 页码) 任务交给抓取/解析流水线批量处理，把进度保存到本地SQLite状态库，
+进程崩溃或被终止后重新运行会从中断处继续；结果写入分片的JSON Lines文件
+"""
+
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import groupby
+
+from news_searcher import search_window
+from parse_pipeline import ParsePipeline
+
+# 关键词状态
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def read_keywords(lines):
+    """
+    从文本行中读取关键词，忽略空行、#开头的注释行和重复的关键词
+
+    Args:
+        lines (iterable): 文本行
+
+    Returns:
+        list: 去重后的关键词列表，保持原有顺序
+    """
+    keywords = []
+    seen = set()
+    for line in lines:
+        keyword = line.strip()
+        if not keyword or keyword.startswith('#') or keyword in seen:
+            continue
+        seen.add(keyword)
+        keywords.append(keyword)
+    return keywords
+
+
+class BatchState:
+    """批量任务的状态库"""
+
+    def __init__(self, path):
+        """
+        打开（或创建）状态库
+
+        Args:
+            path (str): SQLite数据库文件路径
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory if directory else '.', exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS keywords ("
+            " keyword TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " pages INTEGER NOT NULL DEFAULT 0,"
+            " results INTEGER NOT NULL DEFAULT 0,"
+            " shard INTEGER,"
+            " error TEXT,"
+            " updated_at TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def add_keywords(self, keywords):
+        """
+        登记关键词，已经登记过的关键词保持原状态
+
+        Args:
+            keywords (list): 关键词列表
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO keywords (keyword, status) VALUES (?, ?)",
+                [(keyword, STATUS_PENDING) for keyword in keywords],
+            )
+
+    def pending_keywords(self, keywords, retry_failed=False):
+        """
+        筛选出还需要处理的关键词
+
+        Args:
+            keywords (list): 关键词列表
+            retry_failed (bool): 是否重新处理之前失败的关键词
+
+        Returns:
+            list: 需要处理的关键词，保持原有顺序
+        """
+        statuses = dict(self.conn.execute("SELECT keyword, status FROM keywords"))
+        todo = {STATUS_PENDING, STATUS_FAILED} if retry_failed else {STATUS_PENDING}
+        return [keyword for keyword in keywords if statuses.get(keyword, STATUS_PENDING) in todo]
+
+    def mark_done(self, keyword, pages, results, shard):
+        """记录关键词处理完成"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE keywords SET status = ?, pages = ?, results = ?, shard = ?, error = NULL, updated_at = ?"
+                " WHERE keyword = ?",
+                (STATUS_DONE, pages, results, shard, datetime.now().isoformat(), keyword),
+            )
+
+    def mark_failed(self, keyword, error):
+        """记录关键词处理失败"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE keywords SET status = ?, error = ?, updated_at = ? WHERE keyword = ?",
+                (STATUS_FAILED, error, datetime.now().isoformat(), keyword),
+            )
+
+    def begin_job(self, job, retry_failed=False, fresh=False):
+        """
+        开始新的一轮任务，或继续上次中断的任务
+
+        上次的任务已经完整运行结束时（如每晚定时运行），开始新的一轮，所有关键词重新处理；
+        指定 retry_failed 且上一轮有失败的关键词时，继续上一轮以重试这些关键词
+
+        Args:
+            job (dict): 任务参数（页数、时间范围、排序方式、输出目录等）
+            retry_failed (bool): 是否重新处理之前失败的关键词
+            fresh (bool): 丢弃未完成的进度，强制开始新的一轮
+
+        Returns:
+            bool: 是否继续上一轮任务
+
+        Raises:
+            ValueError: 上一轮任务未完成，且任务参数与本次不同
+        """
+        job = json.dumps(job, sort_keys=True, ensure_ascii=False)
+        previous = self.get_meta("job")
+        finished = self.get_meta("finished") == "1"
+
+        resume = previous is not None and not fresh
+        if resume and previous != job:
+            if not finished:
+                raise ValueError(
+                    "状态库中有参数不同的未完成任务，"
+                    "请使用相同的参数继续，或使用 --fresh 丢弃进度、使用其他 --state 开始新任务\n"
+                    f"  上次的参数: {previous}\n  本次的参数: {job}"
+                )
+            resume = False
+        if resume and finished:
+            has_failed = self.conn.execute(
+                "SELECT 1 FROM keywords WHERE status = ? LIMIT 1", (STATUS_FAILED,)
+            ).fetchone() is not None
+            resume = retry_failed and has_failed
+
+        with self.conn:
+            if not resume:
+                # 新的一轮：清空关键词进度，结果写入新的分片
+                self.conn.execute("DELETE FROM keywords")
+                self.conn.execute("DELETE FROM meta WHERE key IN ('shard', 'shard_count')")
+            self.conn.execute("DELETE FROM meta WHERE key = 'finished'")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('job', ?)", (job,))
+        return resume
+
+    def mark_finished(self):
+        """记录本轮任务已完整运行结束"""
+        self.set_meta("finished", 1)
+
+    def get_meta(self, key, default=None):
+        """读取元数据"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        """写入元数据"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+            )
+
+    def close(self):
+        """关闭状态库"""
+        self.conn.close()
+
+
+class ShardWriter:
+    """分片的JSON Lines结果文件"""
+
+    def __init__(self, output_dir, state, shard_size=10000, prefix="results"):
+        """
+        初始化分片写入器，从状态库中恢复当前分片的位置
+
+        Args:
+            output_dir (str): 输出目录
+            state (BatchState): 状态库
+            shard_size (int): 每个分片最多包含的结果数
+            prefix (str): 分片文件名前缀
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.state = state
+        self.shard_size = max(1, shard_size)
+        self.prefix = prefix
+
+        shard = state.get_meta("shard")
+        if shard is None:
+            # 新的一轮从第一个不存在的分片开始，不追加到之前各轮的分片中
+            self.shard = 0
+            while os.path.exists(self.shard_path(self.shard)):
+                self.shard += 1
+            self.count = 0
+        else:
+            self.shard = int(shard)
+            self.count = int(state.get_meta("shard_count", 0))
+
+    def shard_path(self, shard):
+        """返回分片文件路径"""
+        return os.path.join(self.output_dir, f"{self.prefix}-{shard:05d}.jsonl")
+
+    def write(self, items):
+        """
+        追加写入一批结果
+
+        同一关键词的结果写入同一个分片，写满后下一批写入新的分片
+
+        Args:
+            items (list): 结果列表
+
+        Returns:
+            int: 写入的分片编号
+        """
+        if self.count >= self.shard_size:
+            self.shard += 1
+            self.count = 0
+
+        with open(self.shard_path(self.shard), 'a', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.count += len(items)
+        self.state.set_meta("shard", self.shard)
+        self.state.set_meta("shard_count", self.count)
+        return self.shard
+
+
+class BatchRunner:
+    """批量关键词任务执行器"""
+
+    def __init__(self, searcher, state, writer, pages=1, concurrency=4, delay=1.0,
+                 since=None, until=None, sort=None, parse_workers=None):
+        """
+        初始化执行器
+
+        Args:
+            searcher (BaiduNewsSearcher): 搜索器实例，由所有抓取线程共享
+            state (BatchState): 状态库
+            writer (ShardWriter): 分片写入器
+            pages (int): 每个关键词获取的页数
+            concurrency (int): 抓取线程数
+            delay (float): 每个抓取线程两次请求之间的延迟时间（秒）
+            since: 起始时间
+            until: 截止时间
+            sort (str): 排序方式，设置了起始时间但未指定排序时按时间排序
+            parse_workers (int): 解析进程数，默认为CPU核数
+        """
+        self.searcher = searcher
+        self.state = state
+        self.writer = writer
+        self.pages = pages
+        self.concurrency = max(1, concurrency)
+        self.delay = delay
+        self.since, self.until, self.sort = search_window(since, until, sort)
+        self.parse_workers = parse_workers
+
+    def _collect_keyword(self, keyword, outputs, stopped):
+        """
+        汇总流水线按顺序产出的一个关键词的各页结果
+
+        某一页失败或结果超出时间范围后，把关键词加入 stopped，抓取线程跳过它后面的页
+
+        Args:
+            keyword (str): 关键词
+            outputs (iterable): 该关键词的 ((关键词, 页码), 结果列表, 错误信息)
+            stopped (set): 不再需要抓取的关键词
+
+        Returns:
+            tuple: (页数, 结果列表)
+
+        Raises:
+            RuntimeError: 某一页抓取或解析失败
+        """
+        items = []
+        pages = 0
+        try:
+            for page, results, error in self.searcher.filter_pages(
+                ((page, results, error) for (_, page), results, error in outputs),
+                self.since, self.until, self.sort,
+            ):
+                if error is not None:
+                    raise RuntimeError(error)
+                pages += 1
+                for item in results:
+                    item['keyword'] = keyword
+                    item['page'] = page
+                items.extend(results)
+        finally:
+            stopped.add(keyword)
+        return pages, items
+
+    def run(self, keywords, retry_failed=False, progress=None):
+        """
+        执行批量任务
+
+        结果文件和状态库都只在主线程中写入；先写结果再标记完成，
+        中途被终止时最多重复处理正在进行中的关键词。
+        调用前应先调用 BatchState.begin_job
+
+        Args:
+            keywords (list): 关键词列表
+            retry_failed (bool): 是否重新处理之前失败的关键词
+            progress (callable): 每处理完一个关键词调用一次，用于更新进度条
+
+        Returns:
+            dict: 运行统计
+        """
+        self.state.add_keywords(keywords)
+        todo = self.state.pending_keywords(keywords, retry_failed=retry_failed)
+
+        stats = {
+            "total": len(keywords),
+            "skipped": len(keywords) - len(todo),
+            "done": 0,
+            "failed": 0,
+            "pages": 0,
+            "results": 0,
+            "errors": Counter(),
+        }
+        start_time = time.time()
+
+        pipeline = ParsePipeline(
+            self.searcher,
+            fetch_workers=self.concurrency,
+            parse_workers=self.parse_workers,
+            delay=self.delay,
+            search_options={"since": self.since, "until": self.until, "sort": self.sort},
+        )
+        tasks = [(keyword, page) for keyword in todo for page in range(1, self.pages + 1)]
+        stopped = set()
+        # 流水线的有界窗口限制在途任务数，被中断时不必等待大量排队的任务
+        outputs = pipeline.run(tasks, skip=lambda task: task[0] in stopped)
+        try:
+            # 流水线按任务顺序产出，同一关键词的各页是连续的
+            for keyword, keyword_outputs in groupby(outputs, key=lambda output: output[0][0]):
+                try:
+                    pages, items = self._collect_keyword(keyword, keyword_outputs, stopped)
+                except Exception as e:
+                    error = str(e)
+                    self.state.mark_failed(keyword, error)
+                    stats["failed"] += 1
+                    stats["errors"][error[:80]] += 1
+                else:
+                    shard = self.writer.write(items)
+                    self.state.mark_done(keyword, pages, len(items), shard)
+                    stats["done"] += 1
+                    stats["pages"] += pages
+                    stats["results"] += len(items)
+                if progress:
+                    progress()
+        finally:
+            outputs.close()
+            stats["elapsed"] = time.time() - start_time
+
+        self.state.mark_finished()
+        return stats
+
+
+def format_summary(stats):
+    """
+    格式化运行统计
+
+    Args:
+        stats (dict): BatchRunner.run 返回的统计
+
+    Returns:
+        str: 多行的统计文本
+    """
+    elapsed = max(stats["elapsed"], 1e-6)
+    processed = stats["done"] + stats["failed"]
+    lines = [
+        "===== 批量任务统计 =====",
+        f"关键词: 共 {stats['total']} 个, 完成 {stats['done']} 个, 失败 {stats['failed']} 个, "
+        f"跳过(之前已处理) {stats['skipped']} 个",
+        f"页面: {stats['pages']} 页, 结果: {stats['results']} 条",
+        f"用时: {stats['elapsed']:.1f} 秒",
+        f"吞吐量: {processed / elapsed:.2f} 关键词/秒, {stats['pages'] / elapsed:.2f} 页/秒, "
+        f"{stats['results'] / elapsed:.2f} 条/秒",
+    ]
+    if stats["errors"]:
+        lines.append("主要错误:")
+        for error, count in stats["errors"].most_common(5):
+            lines.append(f"  [{count}] {error}")
+    return "\n".join(lines)
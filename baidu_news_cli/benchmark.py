@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+解析性能测试程序
+用存档的原始页面或本地HTML文件作为样本，比较不同解析模式的每页耗时和峰值内存
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from news_searcher import PARSE_MODES, get_layout_stats, parse_search_results, reset_layout_cache
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(
+        description="百度新闻搜索结果解析性能测试",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="HTML样本文件，支持通配符"
+    )
+
+    parser.add_argument(
+        "-a", "--archive",
+        help="原始HTML存档路径 (不含扩展名)，使用存档中的页面作为样本"
+    )
+
+    parser.add_argument(
+        "-m", "--modes",
+        nargs="+",
+        choices=PARSE_MODES,
+        default=list(PARSE_MODES),
+        help="要测试的解析模式 (默认: 全部)"
+    )
+
+    parser.add_argument(
+        "-r", "--repeat",
+        type=int,
+        default=3,
+        help="每个样本重复解析的次数，取最短耗时 (默认: 3)"
+    )
+
+    return parser.parse_args()
+
+
+def load_samples(args):
+    """
+    加载样本页面
+
+    Returns:
+        list: 解码后的HTML字符串列表
+    """
+    samples = []
+    if args.archive:
+        from html_archive import HtmlArchive
+        with HtmlArchive(args.archive) as archive:
+            for _, raw_html in archive:
+                samples.append(raw_html.decode('utf-8', errors='replace'))
+
+    for pattern in args.files:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'rb') as f:
+                samples.append(f.read().decode('utf-8', errors='replace'))
+    return samples
+
+
+def benchmark_mode(samples, mode, repeat, layout_cache=True):
+    """
+    测试一种解析模式
+
+    耗时和内存分两轮测量，避免tracemalloc的开销影响耗时
+
+    Args:
+        samples (list): HTML样本
+        mode (str): 解析模式
+        repeat (int): 每个样本重复解析的次数
+        layout_cache (bool): 是否使用布局选择器方案缓存
+
+    Returns:
+        dict: 统计结果
+    """
+    timings = []
+    results = 0
+    for html_content in samples:
+        best = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            items = parse_search_results(html_content, verbose=False, mode=mode, layout_cache=layout_cache)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+        results += len(items)
+
+    peaks = []
+    for html_content in samples:
+        tracemalloc.start()
+        parse_search_results(html_content, verbose=False, mode=mode, layout_cache=layout_cache)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+
+    timings.sort()
+    return {
+        "mode": mode if layout_cache else f"{mode}-nc",
+        "pages": len(samples),
+        "results": results,
+        "avg_ms": sum(timings) / len(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "avg_peak_kb": sum(peaks) / len(peaks) / 1024,
+        "max_peak_kb": max(peaks) / 1024,
+    }
+
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    samples = load_samples(args)
+    if not samples:
+        print("没有样本页面，请指定HTML文件或 --archive 存档")
+        sys.exit(1)
+
+    print(f"样本: {len(samples)} 页, 平均大小 {sum(len(s) for s in samples) / len(samples) / 1024:.1f} KB")
+    print(f"{'模式':<12}{'页数':>6}{'结果数':>8}{'平均耗时(ms)':>14}{'P95耗时(ms)':>14}{'平均峰值内存(KB)':>18}{'最大峰值内存(KB)':>18}")
+    layout_stats = {}
+    for mode in args.modes:
+        # 每种模式分别测试使用和不使用（-nc）布局缓存的情况，都从空的缓存开始
+        for layout_cache in (True, False):
+            reset_layout_cache()
+            stats = benchmark_mode(samples, mode, args.repeat, layout_cache=layout_cache)
+            if layout_cache:
+                layout_stats[mode] = get_layout_stats()
+            print(f"{stats['mode']:<12}{stats['pages']:>6}{stats['results']:>8}"
+                  f"{stats['avg_ms']:>14.2f}{stats['p95_ms']:>14.2f}"
+                  f"{stats['avg_peak_kb']:>18.1f}{stats['max_peak_kb']:>18.1f}")
+
+    for mode, stats in layout_stats.items():
+        print(f"[{mode}] 布局缓存: 命中 {stats['plan_hits']} 页, 新布局 {stats['new_layouts']} 个, "
+              f"方案失效 {stats['invalidated']} 次, 条目退回 {stats['item_fallbacks']} 次")
+
+
+if __name__ == "__main__":
+    main()
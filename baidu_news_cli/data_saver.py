@@ -66,7 +66,7 @@ def save_to_csv(data, filename):
         if not data:
             with open(filename, 'w', encoding='utf-8', newline='') as f:
                 writer = csv.writer(f)
-                writer.writerow(['title', 'url', 'summary', 'source', 'time'])
+                writer.writerow(['title', 'url', 'summary', 'source', 'time', 'published_at'])
             return True
         
         # 获取所有可能的字段名
@@ -75,7 +75,7 @@ def save_to_csv(data, filename):
             fieldnames.update(item.keys())
         
         # 确保基本字段在前面
-        basic_fields = ['title', 'url', 'summary', 'source', 'time']
+        basic_fields = ['title', 'url', 'summary', 'source', 'time', 'published_at']
         all_fields = []
         
         # 先添加基本字段
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+原始HTML存档模块
+把抓取到的每个页面用zstd压缩后追加写入段文件，并在索引文件中记录偏移量，
+读取时通过mmap按偏移量直接定位。百度页面改版、修复解析选择器后，
+可以用当前的解析器重新解析存档而无需重新抓取，存档也可以作为测试样本数据。
+"""
+
+import json
+import mmap
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from news_searcher import parse_search_results
+
+# 段文件和索引文件的扩展名
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+
+def _require_zstandard():
+    """检查是否安装了zstandard"""
+    if zstandard is None:
+        raise ImportError("存档功能需要安装 zstandard: pip install zstandard")
+
+
+class HtmlArchive:
+    """只追加的压缩HTML存档"""
+
+    def __init__(self, path, level=3):
+        """
+        打开（或创建）存档
+
+        Args:
+            path (str): 存档路径（不含扩展名），会生成 path.seg 和 path.idx 两个文件
+            level (int): zstd压缩级别
+        """
+        _require_zstandard()
+
+        self.path = path
+        self.segment_path = path + SEGMENT_SUFFIX
+        self.index_path = path + INDEX_SUFFIX
+        self.level = level
+
+        directory = os.path.dirname(self.segment_path)
+        os.makedirs(directory if directory else '.', exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._compressor = None
+        self._segment = None
+        self._index = None
+        self._reader = None
+        self._mmap = None
+
+    def _open_for_write(self):
+        """以追加模式打开段文件和索引文件"""
+        if self._segment is None:
+            self._compressor = zstandard.ZstdCompressor(level=self.level)
+            self._segment = open(self.segment_path, 'ab')
+            self._index = open(self.index_path, 'a', encoding='utf-8')
+
+    def append(self, raw_html, keywords="", page=0, url=""):
+        """
+        追加一个页面
+
+        Args:
+            raw_html (bytes): 原始HTML字节
+            keywords (str): 搜索关键词
+            page (int): 页码
+            url (str): 页面URL
+
+        Returns:
+            dict: 该页面的索引记录
+        """
+        with self._lock:
+            self._open_for_write()
+            compressed = self._compressor.compress(raw_html)
+
+            # 以文件末尾为偏移量，之前写入中断留下的残余字节不会被索引引用
+            offset = self._segment.seek(0, os.SEEK_END)
+            self._segment.write(compressed)
+            self._segment.flush()
+
+            record = {
+                "offset": offset,
+                "length": len(compressed),
+                "raw_length": len(raw_html),
+                "keywords": keywords,
+                "page": page,
+                "url": url,
+                "fetched_at": datetime.now().isoformat(),
+            }
+            # 先写段文件再写索引，索引中的记录总是指向完整的数据
+            self._index.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._index.flush()
+            return record
+
+    def records(self):
+        """
+        读取全部索引记录
+
+        Returns:
+            list: 按写入顺序排列的索引记录
+        """
+        if not os.path.exists(self.index_path):
+            return []
+
+        records = []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # 写入中断导致的不完整行
+                    continue
+        return records
+
+    def read_compressed(self, record):
+        """
+        通过mmap读取一条记录的压缩数据
+
+        Args:
+            record (dict): 索引记录
+
+        Returns:
+            bytes: zstd压缩的数据
+        """
+        end = record["offset"] + record["length"]
+        with self._lock:
+            if self._mmap is None or len(self._mmap) < end:
+                # 段文件增长后重新映射
+                self._close_reader()
+                self._reader = open(self.segment_path, 'rb')
+                self._mmap = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap[record["offset"]:end]
+
+    def read(self, record):
+        """
+        读取一条记录的原始HTML
+
+        Args:
+            record (dict): 索引记录
+
+        Returns:
+            bytes: 原始HTML字节
+        """
+        return decompress(self.read_compressed(record))
+
+    def __iter__(self):
+        """依次产出 (索引记录, 原始HTML) """
+        for record in self.records():
+            yield record, self.read(record)
+
+    def _close_reader(self):
+        """关闭mmap读取句柄"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def close(self):
+        """关闭存档"""
+        with self._lock:
+            self._close_reader()
+            if self._segment is not None:
+                self._segment.close()
+                self._index.close()
+                self._segment = None
+                self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def decompress(data):
+    """
+    解压一条zstd压缩的记录
+
+    Args:
+        data (bytes): 压缩数据
+
+    Returns:
+        bytes: 原始数据
+    """
+    _require_zstandard()
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _reparse_worker(page):
+    """
+    解析进程的入口函数，在子进程中解压并解析
+
+    Args:
+        page (tuple): (zstd压缩的原始HTML, 抓取时间的ISO字符串)
+
+    Returns:
+        list: 搜索结果列表
+    """
+    compressed, fetched_at = page
+    raw_html = decompress(compressed)
+    # 相对时间（如"3小时前"）以页面的抓取时间为参照
+    now = datetime.fromisoformat(fetched_at) if fetched_at else None
+    return parse_search_results(raw_html.decode('utf-8', errors='replace'), verbose=False, now=now)
+
+
+def reparse_archive(archive, workers=None, window=None):
+    """
+    用当前的解析器批量重新解析存档中的全部页面
+
+    Args:
+        archive (HtmlArchive): 存档
+        workers (int): 解析进程数，默认为CPU核数
+        window (int): 已提交但尚未产出的页面数上限，默认为解析进程数的4倍
+
+    Yields:
+        tuple: (索引记录, 结果列表)，按写入顺序产出
+    """
+    records = archive.records()
+    if not records:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    window = max(1, window or workers * 4)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            for record in records:
+                # 窗口已满时先产出最早的页面，同一时刻只有窗口内的页面在内存中
+                if len(pending) >= window:
+                    done_record, future = pending.popleft()
+                    yield done_record, future.result()
+                page = (archive.read_compressed(record), record.get("fetched_at"))
+                pending.append((record, executor.submit(_reparse_worker, page)))
+
+            while pending:
+                done_record, future = pending.popleft()
+                yield done_record, future.result()
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的解析
+            for _, future in pending:
+                future.cancel()
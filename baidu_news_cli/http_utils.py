@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP工具模块
+提供URL规范化、按主机限制并发连接数，以及拒绝访问内网地址等通用功能
+"""
+
+import ipaddress
+import socket
+import threading
+import urllib.parse
+from contextlib import contextmanager
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 规范化URL时丢弃的跟踪参数
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "spm", "from", "fr", "wfr", "for",
+}
+
+
+def canonicalize_url(url):
+    """
+    将URL规范化，用作缓存键
+
+    - 协议和主机名转为小写，去掉默认端口
+    - 去掉片段(#...)和常见的跟踪参数
+    - 查询参数按名称排序
+
+    Args:
+        url (str): 原始URL
+
+    Returns:
+        str: 规范化后的URL
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = [
+        (key, value)
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+    ]
+    query.sort()
+
+    path = parts.path or "/"
+    return urllib.parse.urlunsplit((scheme, netloc, path, urllib.parse.urlencode(query), ""))
+
+
+def get_host(url):
+    """
+    获取URL的主机名
+
+    Args:
+        url (str): URL
+
+    Returns:
+        str: 小写主机名
+    """
+    return (urllib.parse.urlsplit(url).hostname or "").lower()
+
+
+class UnsafeURLError(ValueError):
+    """URL不是http/https地址，或指向回环、内网、链路本地等非公网地址"""
+
+
+def is_public_address(address):
+    """
+    判断IP地址是否为公网地址
+
+    Args:
+        address (str): IP地址
+
+    Returns:
+        bool: 是否为公网单播地址
+    """
+    try:
+        ip = ipaddress.ip_address(address.split('%', 1)[0])
+    except ValueError:
+        return False
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_public_url(url):
+    """
+    检查URL是否可以由服务端请求
+
+    只允许http/https，且主机名解析出的所有地址都必须是公网地址，
+    拒绝回环、内网、链路本地（如云服务器的元数据地址）等目标
+
+    Args:
+        url (str): URL
+
+    Raises:
+        UnsafeURLError: URL不允许访问
+    """
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        raise UnsafeURLError(f"只支持http/https地址: {url}")
+    if not parts.hostname:
+        raise UnsafeURLError(f"URL中没有主机名: {url}")
+
+    try:
+        port = parts.port or (443 if scheme == "https" else 80)
+        addresses = socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)
+    except (ValueError, socket.gaierror) as e:
+        raise UnsafeURLError(f"无法解析主机名 {parts.hostname}: {e}")
+    for address in addresses:
+        if not is_public_address(address[4][0]):
+            raise UnsafeURLError(f"不允许访问非公网地址: {parts.hostname} ({address[4][0]})")
+
+
+class _PublicConnectionMixin:
+    """建立连接后检查对端地址，防止主机名在检查之后被解析到内网地址（DNS重绑定）"""
+
+    def _new_conn(self):
+        sock = super()._new_conn()
+        address = sock.getpeername()[0]
+        if not is_public_address(address):
+            sock.close()
+            raise UnsafeURLError(f"不允许访问非公网地址: {self.host} ({address})")
+        return sock
+
+
+class _PublicHTTPConnection(_PublicConnectionMixin, HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PublicConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PublicHTTPConnection
+
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicHTTPSConnection
+
+
+class PublicOnlyAdapter(HTTPAdapter):
+    """只允许连接公网地址的HTTP适配器（不经过代理时生效）"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _PublicHTTPConnectionPool,
+            "https": _PublicHTTPSConnectionPool,
+        }
+
+
+class HostLimiter:
+    """按主机限制并发请求数"""
+
+    def __init__(self, per_host_limit=2):
+        """
+        初始化限流器
+
+        Args:
+            per_host_limit (int): 每个主机允许的最大并发请求数
+        """
+        self.per_host_limit = max(1, per_host_limit)
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self, host):
+        """获取指定主机的信号量，不存在时创建"""
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_limit)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def limit(self, url):
+        """
+        在with语句内占用目标主机的一个并发名额
+
+        Args:
+            url (str): 请求的URL
+        """
+        semaphore = self._get_semaphore(get_host(url))
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+链接解析模块
+百度搜索结果中的链接经常是百度的跳转链接或站内相对链接，
+本模块并发地把它们解析为最终的文章地址：优先发送HEAD请求，
+不支持HEAD时使用流式GET，读到响应头后立即断开。
+解析结果保存在本地SQLite缓存中，下次直接返回。
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_utils import HostLimiter, PublicOnlyAdapter, UnsafeURLError, check_public_url, get_host
+
+# 百度的跳转链接路径，如 www.baidu.com/link?url=...、news.baidu.com/n?cmd=...
+REDIRECT_PATHS = ("/link", "/url", "/n")
+
+# HEAD请求返回这些状态码时改用GET
+HEAD_UNSUPPORTED_STATUS = {403, 405, 501}
+
+# 跳转页面通过页面内容跳转时，最多读取的字节数
+REFRESH_SNIFF_BYTES = 4096
+
+# 页面内跳转的写法：<meta http-equiv="refresh" content="0;URL=...">（属性顺序不限）和脚本跳转
+REFRESH_PATTERNS = [
+    re.compile(r'<meta\b[^>]*\bhttp-equiv\s*=\s*[\'"]?refresh[\'"]?[^>]*'
+               r'\bcontent\s*=\s*[\'"]\s*[\d.]*\s*;\s*url\s*=\s*[\'"]?([^\'">\s]+)', re.I),
+    re.compile(r'<meta\b[^>]*\bcontent\s*=\s*[\'"]\s*[\d.]*\s*;\s*url\s*=\s*[\'"]?([^\'">\s]+)[^>]*'
+               r'\bhttp-equiv\s*=\s*[\'"]?refresh', re.I),
+    re.compile(r'location\.replace\(\s*[\'"]([^\'"]+)[\'"]', re.I),
+    re.compile(r'location\.href\s*=\s*[\'"]([^\'"]+)[\'"]', re.I),
+]
+
+
+def find_refresh_target(text):
+    """
+    从跳转页面的开头找出 meta refresh 或脚本跳转的目标
+
+    Args:
+        text (str): 页面开头的HTML
+
+    Returns:
+        str: 跳转目标（可能是相对地址），没有找到时返回None
+    """
+    for pattern in REFRESH_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def is_redirect_link(url):
+    """
+    判断URL是否为百度的跳转链接
+
+    Args:
+        url (str): URL
+
+    Returns:
+        bool: 是否需要解析
+    """
+    host = get_host(url)
+    if host != "baidu.com" and not host.endswith(".baidu.com"):
+        return False
+    path = urllib.parse.urlsplit(url).path
+    return any(path == prefix or path.startswith(prefix + "/") for prefix in REDIRECT_PATHS)
+
+
+class LinkCache:
+    """持久化的 URL -> 最终地址 缓存"""
+
+    def __init__(self, path, max_age_days=30):
+        """
+        打开（或创建）缓存
+
+        Args:
+            path (str): SQLite数据库文件路径
+            max_age_days (float): 缓存有效期（天）
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory if directory else '.', exist_ok=True)
+
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            " url TEXT PRIMARY KEY,"
+            " target TEXT NOT NULL,"
+            " resolved_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, urls):
+        """
+        批量查询缓存
+
+        Args:
+            urls (list): URL列表
+
+        Returns:
+            dict: 命中缓存的 URL -> 最终地址
+        """
+        found = {}
+        min_time = time.time() - self.max_age
+        urls = list(urls)
+        with self._lock:
+            # SQLite对参数个数有限制，分批查询
+            for start in range(0, len(urls), 500):
+                batch = urls[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for url, target in self.conn.execute(
+                    f"SELECT url, target FROM links WHERE resolved_at >= ? AND url IN ({placeholders})",
+                    [min_time] + batch,
+                ):
+                    found[url] = target
+        return found
+
+    def put_many(self, mapping):
+        """
+        批量写入缓存
+
+        Args:
+            mapping (dict): URL -> 最终地址
+        """
+        now = time.time()
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO links (url, target, resolved_at) VALUES (?, ?, ?)",
+                    [(url, target, now) for url, target in mapping.items()],
+                )
+
+    def close(self):
+        """关闭缓存"""
+        with self._lock:
+            self.conn.close()
+
+
+class LinkResolver:
+    """跳转链接解析器"""
+
+    def __init__(self, cache_path="link_cache.db", timeout=10, max_workers=16, per_host_limit=4, max_hops=5):
+        """
+        初始化解析器
+
+        Args:
+            cache_path (str): 持久化缓存文件路径，为None时不缓存
+            timeout (int): 请求超时时间（秒）
+            max_workers (int): 最大并发请求数
+            per_host_limit (int): 每个主机的最大并发请求数
+            max_hops (int): 最多跟随的跳转次数
+        """
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.max_hops = max_hops
+        self.host_limiter = HostLimiter(per_host_limit)
+        self.cache = LinkCache(cache_path) if cache_path else None
+
+        self.session = requests.Session()
+        # 跳转目标由第三方页面决定，只允许连接公网地址
+        adapter = PublicOnlyAdapter(pool_connections=self.max_workers, pool_maxsize=per_host_limit)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _next_location(self, url, user_agent=None):
+        """
+        请求一次URL，返回跳转目标
+
+        Args:
+            url (str): 当前URL
+            user_agent (str): 请求使用的User-Agent
+
+        Returns:
+            str: 跳转目标，没有跳转时返回None
+
+        Raises:
+            UnsafeURLError: URL不允许访问
+        """
+        check_public_url(url)
+        headers = {"User-Agent": user_agent} if user_agent else None
+        with self.host_limiter.limit(url):
+            response = self.session.head(url, headers=headers, timeout=self.timeout, allow_redirects=False)
+            response.close()
+            if response.is_redirect:
+                return urllib.parse.urljoin(url, response.headers["Location"])
+            if response.status_code not in HEAD_UNSUPPORTED_STATUS and not is_redirect_link(url):
+                return None
+
+            # 不支持HEAD，或百度跳转页返回200并在页面中跳转：使用流式GET
+            response = self.session.get(url, headers=headers, timeout=self.timeout,
+                                        allow_redirects=False, stream=True)
+            try:
+                if response.is_redirect:
+                    return urllib.parse.urljoin(url, response.headers["Location"])
+                if not is_redirect_link(url):
+                    return None
+                # 只读取开头的一小段，从 meta refresh 或脚本中找出跳转目标
+                head = response.raw.read(REFRESH_SNIFF_BYTES, decode_content=True) or b""
+                target = find_refresh_target(head.decode('utf-8', errors='replace'))
+                return urllib.parse.urljoin(url, target) if target else None
+            finally:
+                response.close()
+
+    def resolve(self, url, user_agent=None):
+        """
+        解析单个链接，跟随跳转直到不再跳转或达到最大跳转次数；
+        每一跳请求之前都检查地址，不请求非公网地址
+
+        Args:
+            url (str): 链接
+            user_agent (str): 请求使用的User-Agent
+
+        Returns:
+            str: 最终地址，解析失败时返回原链接
+        """
+        current = url
+        for _ in range(self.max_hops):
+            try:
+                location = self._next_location(current, user_agent)
+            except (requests.RequestException, UnsafeURLError):
+                break
+            if not location or location == current:
+                break
+            current = location
+        return current
+
+    def resolve_many(self, urls, user_agent_factory=None):
+        """
+        并发解析多个链接，非跳转链接原样返回
+
+        Args:
+            urls (list): 链接列表
+            user_agent_factory (callable): 每次解析调用一次以获取User-Agent
+
+        Returns:
+            dict: 链接 -> 最终地址
+        """
+        pending = list(dict.fromkeys(url for url in urls if is_redirect_link(url)))
+        resolved = {url: url for url in urls if not is_redirect_link(url)}
+        if not pending:
+            return resolved
+
+        if self.cache is not None:
+            cached = self.cache.get_many(pending)
+            resolved.update(cached)
+            pending = [url for url in pending if url not in cached]
+
+        if pending:
+            def task(url):
+                user_agent = user_agent_factory() if user_agent_factory else None
+                return self.resolve(url, user_agent)
+
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                fresh = dict(zip(pending, executor.map(task, pending)))
+            resolved.update(fresh)
+
+            if self.cache is not None:
+                # 只缓存真正解析成功的链接，失败的下次重试
+                self.cache.put_many({url: target for url, target in fresh.items() if target != url})
+
+        return resolved
+
+    def close(self):
+        """关闭连接和缓存"""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -8,6 +8,7 @@
 """
 
 import argparse
+import os
 import sys
 import time
 from colorama import init, Fore, Style
@@ -15,6 +16,11 @@ from tqdm import tqdm
 
 from news_searcher import BaiduNewsSearcher
 from data_saver import save_to_json, save_to_csv
+from parse_pipeline import pipeline_search
+from html_archive import HtmlArchive, reparse_archive
+from time_utils import parse_time_bound
+from batch_runner import BatchRunner, BatchState, ShardWriter, format_summary, read_keywords
+from work_queue import default_worker_id, open_work_queue, run_worker
 
 # 初始化colorama
 init(autoreset=True)
@@ -66,9 +72,184 @@ def parse_arguments():
         help="请求之间的延迟时间(秒) (默认: 1.0)"
     )
     
+    parser.add_argument(
+        "-w", "--parse-workers", 
+        type=int, 
+        default=0, 
+        help="流水线模式的解析进程数，大于0时启用抓取与解析分离的流水线 (默认: 0，不启用)"
+    )
+    
+    parser.add_argument(
+        "-f", "--fetch-workers", 
+        type=int, 
+        default=4, 
+        help="流水线模式的抓取线程数 (默认: 4)"
+    )
+    
+    parser.add_argument(
+        "-a", "--archive", 
+        help="原始HTML存档路径 (不含扩展名)，设置后把抓取到的页面压缩存档，之后可用 reparse 命令重新解析"
+    )
+    
+    parser.add_argument(
+        "--since", 
+        help="起始时间，如 2025-06-01、\"2025-06-01 08:00\"、24h、7d、今天、昨天"
+    )
+    
+    parser.add_argument(
+        "--until", 
+        help="截止时间，格式同 --since"
+    )
+    
+    parser.add_argument(
+        "--sort", 
+        choices=["relevance", "time"], 
+        help="排序方式：relevance 按相关度，time 按时间 (设置 --since 时默认按时间)"
+    )
+    
+    parser.add_argument(
+        "--resolve-links", 
+        action="store_true", 
+        help="把百度跳转链接解析为最终的文章地址"
+    )
+    
     return parser.parse_args()
 
 
+def parse_reparse_arguments(argv):
+    """解析 reparse 命令的参数"""
+    parser = argparse.ArgumentParser(
+        prog="main.py reparse",
+        description="用当前的解析器重新解析原始HTML存档，无需重新抓取",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    
+    parser.add_argument(
+        "archive", 
+        help="原始HTML存档路径 (不含扩展名)"
+    )
+    
+    parser.add_argument(
+        "-w", "--workers", 
+        type=int, 
+        default=0, 
+        help="解析进程数 (默认: CPU核数)"
+    )
+    
+    parser.add_argument(
+        "-s", "--save", 
+        choices=["json", "csv", "both"], 
+        default="json", 
+        help="保存结果为JSON或CSV格式 (默认: json)"
+    )
+    
+    parser.add_argument(
+        "-o", "--output", 
+        default="baidu_news_reparsed", 
+        help="输出文件名 (不含扩展名，默认: baidu_news_reparsed)"
+    )
+    
+    return parser.parse_args(argv)
+
+
+def parse_batch_arguments(argv):
+    """解析 batch 命令的参数"""
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="批量搜索关键词，支持断点续跑和分片输出",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    
+    parser.add_argument(
+        "-i", "--input", 
+        default="-", 
+        help="关键词文件，每行一个关键词，- 表示从标准输入读取 (默认: -)"
+    )
+    
+    parser.add_argument(
+        "-p", "--page", 
+        type=int, 
+        default=1, 
+        help="每个关键词获取的页数 (默认: 1)"
+    )
+    
+    parser.add_argument(
+        "-c", "--concurrency", 
+        type=int, 
+        default=4, 
+        help="抓取线程数 (默认: 4)"
+    )
+    
+    parser.add_argument(
+        "-w", "--parse-workers", 
+        type=int, 
+        default=0, 
+        help="解析进程数 (默认: CPU核数)"
+    )
+    
+    parser.add_argument(
+        "-d", "--delay", 
+        type=float, 
+        default=1.0, 
+        help="每个抓取线程两次请求之间的延迟时间(秒) (默认: 1.0)"
+    )
+    
+    parser.add_argument(
+        "--state", 
+        default="batch_state.db", 
+        help="进度状态库文件，重新运行时从中断处继续 (默认: batch_state.db)"
+    )
+    
+    parser.add_argument(
+        "-o", "--output-dir", 
+        default="batch_output", 
+        help="分片结果文件的输出目录 (默认: batch_output)"
+    )
+    
+    parser.add_argument(
+        "--shard-size", 
+        type=int, 
+        default=10000, 
+        help="每个分片文件最多包含的结果数 (默认: 10000)"
+    )
+    
+    parser.add_argument(
+        "--retry-failed", 
+        action="store_true", 
+        help="重新处理上一轮失败的关键词"
+    )
+    
+    parser.add_argument(
+        "--fresh", 
+        action="store_true", 
+        help="丢弃状态库中未完成的进度，开始新的一轮"
+    )
+    
+    parser.add_argument(
+        "--since", 
+        help="起始时间，格式同搜索命令的 --since"
+    )
+    
+    parser.add_argument(
+        "--until", 
+        help="截止时间，格式同 --since"
+    )
+    
+    parser.add_argument(
+        "--sort", 
+        choices=["relevance", "time"], 
+        help="排序方式：relevance 按相关度，time 按时间"
+    )
+    
+    parser.add_argument(
+        "--resolve-links", 
+        action="store_true", 
+        help="把百度跳转链接解析为最终的文章地址"
+    )
+    
+    return parser.parse_args(argv)
+
+
 def display_results(news_items, page_size=10):
     """在命令行中显示搜索结果"""
     if not news_items:
@@ -120,9 +301,283 @@ def display_results(news_items, page_size=10):
                 time.sleep(1)
 
 
+def parse_queue_arguments(argv, command):
+    """解析分布式抓取命令（enqueue、worker、export）的参数"""
+    descriptions = {
+        "enqueue": "把关键词的 (关键词, 页码) 任务加入共享工作队列",
+        "worker": "从共享工作队列领取任务并抓取，可在多台主机上同时运行",
+        "export": "导出共享工作队列中合并后的结果",
+    }
+    parser = argparse.ArgumentParser(
+        prog=f"main.py {command}",
+        description=descriptions[command],
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    
+    parser.add_argument(
+        "-q", "--queue", 
+        default="crawl_queue.db", 
+        help="工作队列地址：SQLite文件路径，或 redis://host:port/db (默认: crawl_queue.db)"
+    )
+    
+    parser.add_argument(
+        "--max-attempts", 
+        type=int, 
+        default=3, 
+        help="每个任务最多尝试的次数 (默认: 3)"
+    )
+    
+    if command == "enqueue":
+        parser.add_argument(
+            "-i", "--input", 
+            default="-", 
+            help="关键词文件，每行一个关键词，- 表示从标准输入读取 (默认: -)"
+        )
+        parser.add_argument(
+            "-p", "--page", 
+            type=int, 
+            default=1, 
+            help="每个关键词获取的页数 (默认: 1)"
+        )
+        parser.add_argument(
+            "-r", "--rate", 
+            type=float, 
+            help="所有工作进程合计每秒最多发送的请求数"
+        )
+        parser.add_argument(
+            "--since", 
+            help="起始时间，格式同搜索命令的 --since"
+        )
+        parser.add_argument(
+            "--until", 
+            help="截止时间，格式同 --since；相对时间在入队时换算为具体时间"
+        )
+        parser.add_argument(
+            "--sort", 
+            choices=["relevance", "time"], 
+            help="排序方式：relevance 按相关度，time 按时间"
+        )
+    elif command == "worker":
+        parser.add_argument(
+            "--worker-id", 
+            help="工作进程ID (默认: 主机名-进程号)"
+        )
+        parser.add_argument(
+            "--lease", 
+            type=float, 
+            default=120, 
+            help="任务租约时长(秒)，超时未完成的任务会被其他工作进程重新领取 (默认: 120)"
+        )
+        parser.add_argument(
+            "--keep-running", 
+            action="store_true", 
+            help="队列为空时继续等待新任务，而不是退出"
+        )
+        parser.add_argument(
+            "--resolve-links", 
+            action="store_true", 
+            help="把百度跳转链接解析为最终的文章地址"
+        )
+    else:
+        parser.add_argument(
+            "-s", "--save", 
+            choices=["json", "csv", "both"], 
+            default="json", 
+            help="保存结果为JSON或CSV格式 (默认: json)"
+        )
+        parser.add_argument(
+            "-o", "--output", 
+            default="baidu_news_crawl", 
+            help="输出文件名 (不含扩展名，默认: baidu_news_crawl)"
+        )
+    
+    return parser.parse_args(argv)
+
+
+def save_results(news_items, save, output):
+    """
+    按命令行指定的格式保存结果
+    
+    Args:
+        news_items (list): 搜索结果列表
+        save (str): 保存格式，json、csv 或 both
+        output (str): 输出文件名（不含扩展名）
+    """
+    if save in ["json", "both"]:
+        json_file = f"{output}.json"
+        save_to_json(news_items, json_file)
+        print(f"{Fore.GREEN}结果已保存为JSON: {json_file}")
+        
+    if save in ["csv", "both"]:
+        csv_file = f"{output}.csv"
+        save_to_csv(news_items, csv_file)
+        print(f"{Fore.GREEN}结果已保存为CSV: {csv_file}")
+
+
+def reparse_main(argv):
+    """reparse 命令：重新解析原始HTML存档"""
+    args = parse_reparse_arguments(argv)
+    
+    with HtmlArchive(args.archive) as archive:
+        records = archive.records()
+        if not records:
+            print(f"{Fore.YELLOW}存档中没有页面: {args.archive}")
+            return
+        
+        print(f"{Fore.CYAN}正在重新解析 {len(records)} 个存档页面...")
+        start_time = time.time()
+        news_items = []
+        with tqdm(total=len(records), desc="解析进度", unit="页") as pbar:
+            for record, results in reparse_archive(archive, workers=args.workers or None):
+                for item in results:
+                    item['keywords'] = record['keywords']
+                    item['page'] = record['page']
+                news_items.extend(results)
+                pbar.update(1)
+        elapsed = time.time() - start_time
+    
+    print(f"{Fore.GREEN}解析完成: {len(records)} 页, {len(news_items)} 条结果, 用时 {elapsed:.2f} 秒")
+    save_results(news_items, args.save, args.output)
+
+
+def batch_main(argv):
+    """batch 命令：批量搜索关键词"""
+    args = parse_batch_arguments(argv)
+    
+    # 读取关键词
+    if args.input == "-":
+        keywords = read_keywords(sys.stdin)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            keywords = read_keywords(f)
+    
+    if not keywords:
+        print(f"{Fore.YELLOW}没有需要搜索的关键词")
+        return
+    
+    since = parse_time_bound(args.since)
+    until = parse_time_bound(args.until, end=True)
+    
+    # 任务参数记录在状态库中，参数不同时不会误用上一次任务的进度
+    job = {
+        "pages": args.page,
+        "since": args.since,
+        "until": args.until,
+        "sort": args.sort,
+        "resolve_links": args.resolve_links,
+        "output_dir": os.path.abspath(args.output_dir),
+    }
+    
+    state = BatchState(args.state)
+    try:
+        try:
+            resumed = state.begin_job(job, retry_failed=args.retry_failed, fresh=args.fresh)
+        except ValueError as e:
+            print(f"{Fore.RED}{e}")
+            return
+        if resumed:
+            print(f"{Fore.CYAN}继续上次未完成的任务")
+        
+        writer = ShardWriter(args.output_dir, state, shard_size=args.shard_size)
+        runner = BatchRunner(
+            BaiduNewsSearcher(verbose=False, resolve_links=args.resolve_links), state, writer,
+            pages=args.page,
+            concurrency=args.concurrency,
+            delay=args.delay,
+            since=since, until=until, sort=args.sort,
+            parse_workers=args.parse_workers or None,
+        )
+        
+        print(f"{Fore.CYAN}共 {len(keywords)} 个关键词，状态库: {args.state}，输出目录: {args.output_dir}")
+        todo = len(state.pending_keywords(keywords, retry_failed=args.retry_failed))
+        with tqdm(total=todo, desc="批量进度", unit="词") as pbar:
+            stats = runner.run(keywords, retry_failed=args.retry_failed, progress=lambda: pbar.update(1))
+    finally:
+        state.close()
+    
+    print(f"{Fore.GREEN}{format_summary(stats)}")
+
+
+def enqueue_main(argv):
+    """enqueue 命令：把关键词任务加入共享工作队列"""
+    args = parse_queue_arguments(argv, "enqueue")
+    
+    if args.input == "-":
+        keywords = read_keywords(sys.stdin)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            keywords = read_keywords(f)
+    
+    # 相对时间在入队时换算为具体时间，所有工作进程使用同一个时间范围
+    since = parse_time_bound(args.since)
+    until = parse_time_bound(args.until, end=True)
+    
+    work_queue = open_work_queue(args.queue, max_attempts=args.max_attempts)
+    try:
+        if args.rate:
+            work_queue.set_rate(args.rate)
+        added = sum(
+            work_queue.enqueue(keyword, pages=args.page, since=since, until=until, sort=args.sort)
+            for keyword in keywords
+        )
+        print(f"{Fore.GREEN}新加入 {added} 个任务 ({len(keywords)} 个关键词)，队列状态: {work_queue.stats()}")
+    finally:
+        work_queue.close()
+
+
+def worker_main(argv):
+    """worker 命令：从共享工作队列领取任务并抓取"""
+    args = parse_queue_arguments(argv, "worker")
+    
+    work_queue = open_work_queue(args.queue, max_attempts=args.max_attempts)
+    try:
+        worker_id = args.worker_id or default_worker_id()
+        print(f"{Fore.CYAN}工作进程 {worker_id} 已启动，队列: {args.queue}")
+        start_time = time.time()
+        stats = run_worker(
+            work_queue, BaiduNewsSearcher(verbose=False, resolve_links=args.resolve_links),
+            worker_id=worker_id,
+            lease_seconds=args.lease,
+            exit_when_idle=not args.keep_running,
+        )
+        elapsed = time.time() - start_time
+        print(f"{Fore.GREEN}工作进程 {worker_id} 结束: 完成 {stats['done']} 个任务, 失败 {stats['failed']} 次, "
+              f"{stats['results']} 条结果, 用时 {elapsed:.1f} 秒")
+        print(f"{Fore.CYAN}队列状态: {work_queue.stats()}")
+    finally:
+        work_queue.close()
+
+
+def export_main(argv):
+    """export 命令：导出共享工作队列中合并后的结果"""
+    args = parse_queue_arguments(argv, "export")
+    
+    work_queue = open_work_queue(args.queue, max_attempts=args.max_attempts)
+    try:
+        news_items = list(work_queue.iter_results())
+        print(f"{Fore.CYAN}共 {len(news_items)} 条结果，队列状态: {work_queue.stats()}")
+        save_results(news_items, args.save, args.output)
+    finally:
+        work_queue.close()
+
+
+# 子命令，命令行第一个参数匹配时执行对应的函数，否则作为搜索关键词处理
+COMMANDS = {
+    "reparse": reparse_main,
+    "batch": batch_main,
+    "enqueue": enqueue_main,
+    "worker": worker_main,
+    "export": export_main,
+}
+
+
 def main():
     """主函数"""
     try:
+        if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+            COMMANDS[sys.argv[1]](sys.argv[2:])
+            return
+        
         # 解析命令行参数
         args = parse_arguments()
         
@@ -130,40 +585,57 @@ def main():
         keywords = " ".join(args.keywords)
         print(f"{Fore.CYAN}正在搜索: {Fore.YELLOW}{keywords}")
         
+        # 解析时间范围
+        since = parse_time_bound(args.since)
+        until = parse_time_bound(args.until, end=True)
+        if since or until:
+            print(f"{Fore.CYAN}时间范围: {since or '不限'} ~ {until or '不限'}")
+        
         # 创建搜索器实例
-        searcher = BaiduNewsSearcher()
+        archive = HtmlArchive(args.archive) if args.archive else None
+        searcher = BaiduNewsSearcher(archive=archive, resolve_links=args.resolve_links)
         
         # 显示进度条
         with tqdm(total=args.page, desc="搜索进度", unit="页") as pbar:
             # 执行搜索
             news_items = []
-            for page in range(1, args.page + 1):
-                try:
-                    page_items = searcher.search(keywords, page=page)
+            if args.parse_workers > 0:
+                # 流水线模式：抓取线程与解析进程并行工作，结果按页码顺序返回
+                for page, page_items, error in pipeline_search(
+                    searcher, keywords, args.page,
+                    since=since, until=until, sort=args.sort,
+                    fetch_workers=args.fetch_workers,
+                    parse_workers=args.parse_workers,
+                    delay=args.delay,
+                ):
+                    if error:
+                        print(f"{Fore.RED}搜索第 {page} 页时出错: {error}")
                     news_items.extend(page_items)
                     pbar.update(1)
-                    
-                    # 添加延迟，避免被反爬
-                    if page < args.page:
-                        time.sleep(args.delay)
+            else:
+                page = 0
+                try:
+                    # 请求之间自动添加延迟，避免被反爬；超出时间范围后提前停止翻页
+                    for page, page_items in searcher.search_pages(
+                        keywords, args.page,
+                        since=since, until=until, sort=args.sort,
+                        delay=args.delay,
+                    ):
+                        news_items.extend(page_items)
+                        pbar.update(1)
                 except Exception as e:
-                    print(f"{Fore.RED}搜索第 {page} 页时出错: {str(e)}")
-                    break
+                    print(f"{Fore.RED}搜索第 {page + 1} 页时出错: {str(e)}")
+        
+        if archive is not None:
+            archive.close()
+            print(f"{Fore.GREEN}原始页面已存档: {args.archive}")
         
         # 显示结果
         display_results(news_items, page_size=args.num)
         
         # 保存结果
         if args.save:
-            if args.save in ["json", "both"]:
-                json_file = f"{args.output}.json"
-                save_to_json(news_items, json_file)
-                print(f"{Fore.GREEN}结果已保存为JSON: {json_file}")
-                
-            if args.save in ["csv", "both"]:
-                csv_file = f"{args.output}.csv"
-                save_to_csv(news_items, csv_file)
-                print(f"{Fore.GREEN}结果已保存为CSV: {csv_file}")
+            save_results(news_items, args.save, args.output)
     
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}程序已被用户中断")
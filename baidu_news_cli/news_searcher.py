@@ -6,11 +6,21 @@
 负责构建搜索URL、发送HTTP请求到百度新闻搜索，并处理可能的反爬虫机制
 """
 
+import hashlib
 import random
+import re
+import threading
 import time
 import urllib.parse
+from collections import Counter, OrderedDict
+from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from article_fetcher import ArticleFetcher
+from http_utils import canonicalize_url
+from link_resolver import LinkResolver
+from time_utils import filter_by_time, parse_news_time, parse_time_bound
 
 # 常用User-Agent列表，用于随机选择，减少被反爬的可能性
 USER_AGENTS = [
@@ -21,20 +31,82 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
 ]
 
+# 搜索结果所在区域的id，按顺序尝试
+RESULT_REGION_IDS = ["content_left"]
+
+# 兜底扫描时，类名中包含这些关键词的div被视为可能的新闻条目
+FALLBACK_CLASS_PATTERN = re.compile(r'result|news|item|container', re.I)
+
+# 兜底扫描最多返回的条目数
+MAX_FALLBACK_ITEMS = 200
+
+# 解析模式：targeted 只构建结果区域的子树，full 构建整个页面的树
+PARSE_MODES = ("targeted", "full")
+
+# 尝试多种可能的选择器来适应百度新闻的不同版本，按顺序尝试
+CONTAINER_SELECTORS = [
+    'div.result', 'div.news-item', 'div.c-container', 
+    'div[class*="result"]', 'div[class*="news"]'
+]
+TITLE_SELECTORS = ['h3 a', 'a.news-title', 'a[class*="title"]', 'a']
+SUMMARY_SELECTORS = ['div.c-summary', 'div.content', 'div[class*="summary"]', 'div[class*="content"]', 'p']
+SOURCE_SELECTORS = ['div.c-author', 'div.source', 'span.source', 'div[class*="source"]']
+
+# 各字段的候选选择器
+FIELD_SELECTORS = {
+    'container': CONTAINER_SELECTORS,
+    'title': TITLE_SELECTORS,
+    'summary': SUMMARY_SELECTORS,
+    'source': SOURCE_SELECTORS,
+}
+
+# 计算布局指纹时只扫描结果区域开头的字符数，足以覆盖前几条新闻
+FINGERPRINT_CHARS = 16 * 1024
+LAYOUT_TAG_PATTERN = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)([^>]*)>')
+LAYOUT_CLASS_PATTERN = re.compile(r'class\s*=\s*["\']([^"\']*)["\']', re.I)
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# 最多缓存的页面布局数
+MAX_SELECTOR_PLANS = 64
+
+# 布局指纹 -> 选择器方案，按最近使用顺序排列
+_selector_plans = OrderedDict()
+_seen_layouts = set()
+_layout_stats = Counter()
+_plan_lock = threading.Lock()
+
+# 排序方式对应的百度新闻rtt参数：1为按焦点（相关度）排序，4为按时间排序
+SORT_PARAMS = {
+    "relevance": 1,
+    "time": 4,
+}
+
 
 class BaiduNewsSearcher:
     """百度新闻搜索类"""
     
-    def __init__(self, timeout=10, max_retries=3):
+    def __init__(self, timeout=10, max_retries=3, archive=None, verbose=True,
+                 resolve_links=False, link_cache_path="link_cache.db", before_request=None):
         """
         初始化搜索器
         
         Args:
             timeout (int): 请求超时时间（秒）
             max_retries (int): 最大重试次数
+            archive (HtmlArchive): 可选的原始HTML存档，设置后每个抓取到的页面都会被存档
+            verbose (bool): 是否打印解析过程信息
+            resolve_links (bool): 是否把百度跳转链接解析为最终的文章地址
+            link_cache_path (str): 链接解析结果的持久化缓存文件路径
+            before_request (callable): 每次发送搜索请求（包括重试）前调用的无参函数，
+                                       可用于从共享的速率预算中取得请求配额
         """
         self.timeout = timeout
         self.max_retries = max_retries
+        self.archive = archive
+        self.verbose = verbose
+        self.resolve_links = resolve_links
+        self.link_cache_path = link_cache_path
+        self.before_request = before_request
         self.session = requests.Session()
         
         # 设置基本请求头
@@ -44,18 +116,26 @@ class BaiduNewsSearcher:
             "Connection": "keep-alive",
             "Referer": "https://www.baidu.com/",
         })
+        
+        # 正文抓取器和链接解析器在第一次使用时创建
+        self._article_fetcher = None
+        self._link_resolver = None
+        self._lock = threading.Lock()
     
     def _get_random_user_agent(self):
         """随机获取一个User-Agent"""
         return random.choice(USER_AGENTS)
     
-    def _build_search_url(self, keywords, page=1):
+    def _build_search_url(self, keywords, page=1, since=None, until=None, sort=None):
         """
         构建百度新闻搜索URL
         
         Args:
             keywords (str): 搜索关键词
             page (int): 页码
+            since (datetime): 起始时间，对应bt参数
+            until (datetime): 截止时间，对应et参数
+            sort (str): 排序方式，relevance 或 time，默认使用百度的默认排序
         
         Returns:
             str: 搜索URL
@@ -67,39 +147,57 @@ class BaiduNewsSearcher:
         # 百度新闻的分页参数是pn，每页10条，从0开始
         pn = (page - 1) * 10
         
+        # 时间范围参数bt/et为Unix时间戳，0表示不限制
+        bt = int(since.timestamp()) if since else 0
+        et = int(until.timestamp()) if until else 0
+        
         # 构建URL
-        url = f"https://news.baidu.com/ns?word={encoded_keywords}&pn={pn}&cl=2&ct=1&tn=news&rn=10&ie=utf-8&bt=0&et=0"
+        url = f"https://news.baidu.com/ns?word={encoded_keywords}&pn={pn}&cl=2&ct=1&tn=news&rn=10&ie=utf-8&bt={bt}&et={et}"
+        
+        if sort:
+            if sort not in SORT_PARAMS:
+                raise ValueError(f"不支持的排序方式: {sort}")
+            url += f"&rtt={SORT_PARAMS[sort]}"
         
         return url
     
-    def search(self, keywords, page=1):
+    def fetch_page(self, keywords, page=1, since=None, until=None, sort=None):
         """
-        执行百度新闻搜索
+        下载一页百度新闻搜索结果的原始HTML
+        
+        每次请求单独携带随机User-Agent而不修改session的公共请求头，
+        因此同一个搜索器可以被多个抓取线程共享
         
         Args:
             keywords (str): 搜索关键词
             page (int): 页码
+            since (datetime): 起始时间
+            until (datetime): 截止时间
+            sort (str): 排序方式，relevance 或 time
         
         Returns:
-            list: 搜索结果列表，每个结果是一个字典，包含标题、链接、摘要等信息
+            bytes: 原始HTML字节
         """
-        url = self._build_search_url(keywords, page)
+        url = self._build_search_url(keywords, page, since=since, until=until, sort=sort)
         
         # 尝试发送请求，最多重试max_retries次
         for attempt in range(self.max_retries):
             try:
-                # 更新User-Agent
-                self.session.headers.update({"User-Agent": self._get_random_user_agent()})
+                if self.before_request is not None:
+                    self.before_request()
                 
                 # 发送请求
-                response = self.session.get(url, timeout=self.timeout)
+                response = self.session.get(
+                    url,
+                    headers={"User-Agent": self._get_random_user_agent()},
+                    timeout=self.timeout,
+                )
                 response.raise_for_status()  # 如果状态码不是200，抛出异常
                 
-                # 确保响应内容是UTF-8编码
-                response.encoding = 'utf-8'
+                if self.archive is not None:
+                    self.archive.append(response.content, keywords=keywords, page=page, url=url)
                 
-                # 解析搜索结果
-                return self._parse_search_results(response.text)
+                return response.content
                 
             except requests.RequestException as e:
                 if attempt < self.max_retries - 1:
@@ -110,133 +208,581 @@ class BaiduNewsSearcher:
                     # 如果是最后一次尝试，抛出异常
                     raise Exception(f"搜索请求失败: {str(e)}")
     
-    def _parse_search_results(self, html_content):
+    def search(self, keywords, page=1, since=None, until=None, sort=None):
+        """
+        执行百度新闻搜索
+        
+        Args:
+            keywords (str): 搜索关键词
+            page (int): 页码
+            since: 起始时间，可以是datetime或 parse_time_bound 支持的字符串（如"2025-06-01"、"24h"、"今天"）
+            until: 截止时间，格式同since
+            sort (str): 排序方式，relevance 或 time
+        
+        Returns:
+            list: 搜索结果列表，每个结果是一个字典，包含标题、链接、摘要等信息
+        """
+        results, _ = self._search_page(keywords, page, since, until, sort)
+        return results
+    
+    def search_pages(self, keywords, pages, since=None, until=None, sort=None, delay=0.0):
+        """
+        依次获取多页结果，结果超出时间范围后提前停止翻页
+        
+        按时间排序时，一页中所有时间已知的结果都早于起始时间，
+        说明后面的页面只会更旧，不再继续请求
+        
+        Args:
+            keywords (str): 搜索关键词
+            pages (int): 最多获取的页数
+            since: 起始时间
+            until: 截止时间
+            sort (str): 排序方式，设置了起始时间但未指定排序时按时间排序
+            delay (float): 请求之间的延迟时间（秒）
+        
+        Yields:
+            tuple: (页码, 该页在时间范围内的结果列表)
+        """
+        now = datetime.now()
+        since, until, sort = search_window(since, until, sort, now)
+        
+        def fetch_pages():
+            for page in range(1, pages + 1):
+                # 添加延迟，避免被反爬
+                if page > 1:
+                    time.sleep(delay)
+                yield page, self._fetch_results(keywords, page, since, until, sort, now), None
+        
+        for page, results, _ in self.filter_pages(fetch_pages(), since, until, sort, now=now):
+            yield page, results
+    
+    def filter_pages(self, pages, since=None, until=None, sort=None, now=None):
+        """
+        按时间范围过滤逐页到达的结果，为保留的结果解析链接，超出时间范围后停止
+        
+        顺序翻页（search_pages）和流水线（pipeline_search、批量任务）共用这一逻辑
+        
+        Args:
+            pages (iterable): 按页码顺序产出的 (页码, 结果列表, 错误信息)
+            since (datetime): 起始时间，应先用 search_window 换算
+            until (datetime): 截止时间
+            sort (str): 排序方式
+            now (datetime): 解析模糊时间的参照时间
+        
+        Yields:
+            tuple: (页码, 该页在时间范围内的结果列表, 错误信息)
+        """
+        for page, results, error in pages:
+            results, past_window = self._filter_page(results, since, until, now)
+            yield page, results, error
+            
+            # 只有按时间排序时，整页过旧才能说明后面的页面更旧
+            if past_window and sort == "time":
+                if self.verbose:
+                    print(f"第 {page} 页的结果已早于起始时间，停止翻页")
+                break
+    
+    def _search_page(self, keywords, page, since, until, sort):
+        """
+        获取一页结果并按时间范围过滤
+        
+        Returns:
+            tuple: (范围内的结果列表, 是否整页都早于起始时间)
+        """
+        now = datetime.now()
+        since = parse_time_bound(since, now)
+        until = parse_time_bound(until, now, end=True)
+        results = self._fetch_results(keywords, page, since, until, sort, now)
+        return self._filter_page(results, since, until, now)
+    
+    def _fetch_results(self, keywords, page, since, until, sort, now):
+        """下载并解析一页结果，不做时间过滤"""
+        raw_html = self.fetch_page(keywords, page, since=since, until=until, sort=sort)
+        # 百度新闻页面为UTF-8编码
+        return self._parse_search_results(raw_html.decode('utf-8', errors='replace'), now=now)
+    
+    def _filter_page(self, results, since, until, now=None):
+        """
+        按时间范围过滤一页结果，并为保留的结果解析链接
+        
+        Returns:
+            tuple: (范围内的结果列表, 是否整页都早于起始时间)
+        """
+        # 先按时间过滤，不为会被丢弃的结果解析链接
+        results, past_window = filter_by_time(results, since, until, now=now)
+        if results and self.resolve_links:
+            results = self.resolve_result_links(results)
+        return results, past_window
+    
+    def resolve_result_links(self, results):
+        """
+        把结果中的百度跳转链接并发解析为最终的文章地址，并按最终地址去重
+        
+        解析成功的结果中，原来的跳转链接保存在baidu_url字段
+        
+        Args:
+            results (list): 搜索结果列表
+        
+        Returns:
+            list: 处理后的结果列表
+        """
+        with self._lock:
+            if self._link_resolver is None:
+                self._link_resolver = LinkResolver(cache_path=self.link_cache_path, timeout=self.timeout)
+        
+        targets = self._link_resolver.resolve_many(
+            [item['url'] for item in results if item.get('url')],
+            user_agent_factory=self._get_random_user_agent,
+        )
+        
+        resolved = []
+        seen = set()
+        for item in results:
+            target = targets.get(item.get('url'), item.get('url'))
+            if target and target != item['url']:
+                item['baidu_url'] = item['url']
+                item['url'] = target
+            
+            key = canonicalize_url(item['url']) if item.get('url') else None
+            if key in seen:
+                continue
+            if key:
+                seen.add(key)
+            resolved.append(item)
+        return resolved
+    
+    def fetch_articles(self, urls, max_workers=8, per_host_limit=2, max_bytes=2 * 1024 * 1024):
+        """
+        并发抓取新闻正文
+        
+        搜索结果只包含百度截断后的摘要，需要全文时调用本方法。
+        结果按规范化URL缓存，重复抓取同一篇文章不会再发送请求。
+        
+        Args:
+            urls (list): 文章URL列表
+            max_workers (int): 最大并发下载数（仅在第一次调用时生效）
+            per_host_limit (int): 每个主机的最大并发连接数（仅在第一次调用时生效）
+            max_bytes (int): 单个页面最多读取的字节数（仅在第一次调用时生效）
+        
+        Returns:
+            list: 与urls顺序一致的结果列表，每个结果包含title、text、final_url、error等字段
+        """
+        with self._lock:
+            if self._article_fetcher is None:
+                self._article_fetcher = ArticleFetcher(
+                    timeout=self.timeout,
+                    max_workers=max_workers,
+                    per_host_limit=per_host_limit,
+                    max_bytes=max_bytes,
+                )
+        return self._article_fetcher.fetch_many(urls, user_agent_factory=self._get_random_user_agent)
+    
+    def close(self):
+        """关闭搜索器持有的HTTP连接"""
+        self.session.close()
+        if self._article_fetcher is not None:
+            self._article_fetcher.session.close()
+        if self._link_resolver is not None:
+            self._link_resolver.close()
+    
+    def _parse_search_results(self, html_content, now=None):
         """
         解析百度新闻搜索结果HTML
         
         Args:
             html_content (str): HTML内容
+            now (datetime): 页面的抓取时间，用于把相对时间转换为绝对时间
         
         Returns:
             list: 搜索结果列表
         """
+        return parse_search_results(html_content, verbose=self.verbose, now=now)
+
+
+def search_window(since=None, until=None, sort=None, now=None):
+    """
+    换算多页搜索的时间范围和排序方式
+
+    设置了起始时间但未指定排序时按时间排序，以便结果超出时间范围后提前停止翻页
+
+    Args:
+        since: 起始时间，datetime或 parse_time_bound 支持的字符串
+        until: 截止时间，格式同since，按日期等粗粒度给出时取该范围的末尾
+        sort (str): 排序方式
+        now (datetime): 相对时间的参照时间
+
+    Returns:
+        tuple: (起始时间, 截止时间, 排序方式)
+    """
+    since = parse_time_bound(since, now)
+    until = parse_time_bound(until, now, end=True)
+    if since and not sort:
+        sort = "time"
+    return since, until, sort
+
+
+def _parse_result_region(html_content):
+    """
+    只为搜索结果区域构建子树
+    
+    先在字符串层面跳过结果区域之前的内容（<head>中的脚本、导航栏等），
+    再用SoupStrainer只保留结果区域的元素，页脚等其他部分不会被构建为节点
+    
+    Args:
+        html_content (str): HTML内容
+    
+    Returns:
+        tuple: (结果区域的子树, 结果区域在HTML中的起始位置)，找不到结果区域时返回(None, None)
+    """
+    for region_id in RESULT_REGION_IDS:
+        start = _find_result_region(html_content, region_id)
+        if start is None:
+            continue
+        soup = BeautifulSoup(html_content[start:], 'lxml', parse_only=SoupStrainer(id=region_id))
+        if soup.find(id=region_id) is not None:
+            return soup, start
+    return None, None
+
+
+def _find_result_region(html_content, region_id):
+    """返回结果区域开始标签在HTML中的位置，找不到时返回None"""
+    marker = html_content.find(f'id="{region_id}"')
+    if marker < 0:
+        return None
+    start = html_content.rfind('<', 0, marker)
+    return start if start >= 0 else None
+
+
+def layout_fingerprint(html_content, start=None):
+    """
+    计算页面布局指纹
+    
+    只扫描结果区域开头的 FINGERPRINT_CHARS 个字符，收集其中的标签名和类名
+    （数字替换为#，忽略动态编号），排序后取哈希。同一布局的不同页面得到相同的指纹
+    
+    Args:
+        html_content (str): HTML内容
+        start (int): 结果区域的起始位置，为None时自动查找，找不到时从页面开头扫描
+    
+    Returns:
+        str: 布局指纹
+    """
+    if start is None:
+        for region_id in RESULT_REGION_IDS:
+            start = _find_result_region(html_content, region_id)
+            if start is not None:
+                break
+        else:
+            start = 0
+    
+    signature = set()
+    for tag, attrs in LAYOUT_TAG_PATTERN.findall(html_content, start, start + FINGERPRINT_CHARS):
+        match = LAYOUT_CLASS_PATTERN.search(attrs)
+        classes = DIGITS_PATTERN.sub('#', match.group(1)) if match else ''
+        signature.add(f"{tag.lower()}.{'.'.join(sorted(classes.split()))}")
+    return hashlib.md5(' '.join(sorted(signature)).encode('utf-8')).hexdigest()[:16]
+
+
+def get_layout_stats():
+    """
+    获取选择器方案缓存的统计
+    
+    Returns:
+        dict: plan_hits 命中已知布局的页数，new_layouts 出现的新布局数，
+              invalidated 方案失效的次数，item_fallbacks 条目字段退回逐个尝试选择器的次数，
+              cached_plans 当前缓存的方案数
+    """
+    with _plan_lock:
+        stats = {key: _layout_stats[key] for key in ('plan_hits', 'new_layouts', 'invalidated', 'item_fallbacks')}
+        stats['cached_plans'] = len(_selector_plans)
+    return stats
+
+
+def reset_layout_cache():
+    """清空选择器方案缓存和统计"""
+    with _plan_lock:
+        _selector_plans.clear()
+        _seen_layouts.clear()
+        _layout_stats.clear()
+
+
+def _get_plan(fingerprint):
+    """读取布局对应的选择器方案"""
+    with _plan_lock:
+        plan = _selector_plans.get(fingerprint)
+        if plan is not None:
+            _selector_plans.move_to_end(fingerprint)
+        return plan
+
+
+def _store_plan(fingerprint, plan):
+    """保存布局对应的选择器方案"""
+    with _plan_lock:
+        _selector_plans[fingerprint] = plan
+        _selector_plans.move_to_end(fingerprint)
+        while len(_selector_plans) > MAX_SELECTOR_PLANS:
+            _selector_plans.popitem(last=False)
+
+
+def _drop_plan(fingerprint):
+    """丢弃不再适用的选择器方案"""
+    with _plan_lock:
+        _selector_plans.pop(fingerprint, None)
+        _layout_stats['invalidated'] += 1
+
+
+def _mark_layout_seen(fingerprint):
+    """
+    记录出现过的布局
+    
+    Returns:
+        bool: 是否第一次出现
+    """
+    with _plan_lock:
+        if fingerprint in _seen_layouts:
+            return False
+        # 限制记录的指纹数，避免长期运行时无限增长
+        if len(_seen_layouts) >= MAX_SELECTOR_PLANS * 16:
+            _seen_layouts.clear()
+        _seen_layouts.add(fingerprint)
+        _layout_stats['new_layouts'] += 1
+        return True
+
+
+def _count(key, amount=1):
+    """更新布局统计"""
+    with _plan_lock:
+        _layout_stats[key] += amount
+
+
+def _select_first(item, selectors):
+    """
+    按顺序尝试选择器，返回第一个包含文本的元素
+    
+    Args:
+        item: 新闻条目元素
+        selectors (list): 候选选择器
+    
+    Returns:
+        tuple: (元素, 命中的选择器)；都没有命中时返回最后尝试的元素和None
+    """
+    element = None
+    for selector in selectors:
+        element = item.select_one(selector)
+        if element and element.get_text(strip=True):
+            return element, selector
+    return element, None
+
+
+def _select_field(item, field, plan, winners):
+    """
+    提取条目的一个字段
+    
+    已知布局直接使用方案中的选择器，没有命中时才对该条目逐个尝试候选选择器
+    
+    Args:
+        item: 新闻条目元素
+        field (str): 字段名，title、summary 或 source
+        plan (dict): 布局的选择器方案，新布局为None
+        winners (dict): 字段 -> 各条目命中的选择器集合，用于为新布局生成方案
+    
+    Returns:
+        tuple: (元素, 命中的选择器)
+    """
+    cached = plan and plan[field]
+    if cached:
+        element = item.select_one(cached)
+        if element and element.get_text(strip=True):
+            return element, cached
+        _count('item_fallbacks')
+    
+    element, selector = _select_first(item, FIELD_SELECTORS[field])
+    if selector:
+        winners[field].add(selector)
+    return element, selector
+
+
+def _build_plan(container_selector, winners):
+    """
+    根据新布局的解析过程生成选择器方案
+    
+    每个字段保存命中过的优先级最高的选择器，没有任何条目命中的字段保存None
+    
+    Args:
+        container_selector (str): 命中的条目选择器
+        winners (dict): 字段 -> 各条目命中的选择器集合
+    
+    Returns:
+        dict: 字段 -> 选择器
+    """
+    plan = {'container': container_selector}
+    for field, selected in winners.items():
+        plan[field] = next((selector for selector in FIELD_SELECTORS[field] if selector in selected), None)
+    return plan
+
+
+def parse_search_results(html_content, verbose=True, now=None, mode="targeted", layout_cache=True):
+    """
+    解析百度新闻搜索结果HTML
+    
+    独立于搜索器实例的模块级函数，可以直接交给进程池中的解析进程调用
+    
+    Args:
+        html_content (str): HTML内容
+        verbose (bool): 是否打印解析过程信息
+        now (datetime): 页面的抓取时间，用于把相对时间转换为绝对时间，默认为当前时间
+        mode (str): 解析模式，targeted 只解析结果区域（找不到时退回整页解析），full 解析整个页面
+        layout_cache (bool): 是否使用按布局指纹缓存的选择器方案
+    
+    Returns:
+        list: 搜索结果列表
+    """
+    if mode not in PARSE_MODES:
+        raise ValueError(f"不支持的解析模式: {mode}")
+    
+    log = print if verbose else _silent
+    now = now or datetime.now()
+    
+    soup, region_start = _parse_result_region(html_content) if mode == "targeted" else (None, None)
+    if soup is None:
+        mode = "full"
         soup = BeautifulSoup(html_content, 'lxml')
-        results = []
-        
-        # 尝试多种可能的选择器来适应百度新闻的不同版本
-        possible_selectors = [
-            'div.result', 'div.news-item', 'div.c-container', 
-            'div[class*="result"]', 'div[class*="news"]'
-        ]
-        
-        news_items = []
-        for selector in possible_selectors:
+    results = []
+    
+    # 已知布局直接使用缓存的选择器方案，跳过逐个尝试
+    fingerprint = None
+    plan = None
+    if layout_cache:
+        fingerprint = layout_fingerprint(html_content, region_start)
+        plan = _get_plan(fingerprint)
+    
+    news_items = []
+    container_selector = None
+    if plan is not None:
+        news_items = soup.select(plan['container'])
+        if news_items:
+            container_selector = plan['container']
+            _count('plan_hits')
+        else:
+            # 方案不再适用，重新探测
+            plan = None
+            _drop_plan(fingerprint)
+    elif fingerprint is not None and _mark_layout_seen(fingerprint):
+        log(f"检测到新的页面布局: {fingerprint}")
+    
+    if not news_items:
+        for selector in CONTAINER_SELECTORS:
             items = soup.select(selector)
             if items:
                 news_items = items
-                print(f"找到 {len(items)} 条新闻，使用选择器: {selector}")
+                container_selector = selector
+                log(f"找到 {len(items)} 条新闻，使用选择器: {selector}")
                 break
-        
-        if not news_items:
-            # 如果没有找到任何新闻条目，尝试查找所有可能包含新闻的div
-            print("未找到新闻条目，尝试查找所有可能的新闻div...")
-            all_divs = soup.find_all('div', class_=True)
-            for div in all_divs:
-                class_name = ' '.join(div.get('class', []))
-                if any(keyword in class_name.lower() for keyword in ['result', 'news', 'item', 'container']):
-                    news_items.append(div)
-        
-        print(f"总共找到 {len(news_items)} 个可能的新闻条目")
-        
-        for item in news_items:
-            try:
-                # 尝试多种可能的标题选择器
-                title_element = None
-                for selector in ['h3 a', 'a.news-title', 'a[class*="title"]', 'a']:
-                    title_element = item.select_one(selector)
-                    if title_element and title_element.get_text(strip=True):
-                        break
-                
-                if not title_element:
-                    continue
-                    
-                title = title_element.get_text(strip=True)
-                url = title_element.get('href', '')
-                
-                # 如果URL是相对路径，转换为绝对路径
-                if url.startswith('/'):
-                    url = f"https://news.baidu.com{url}"
-                
-                # 尝试多种可能的摘要选择器
-                summary_element = None
-                for selector in ['div.c-summary', 'div.content', 'div[class*="summary"]', 'div[class*="content"]', 'p']:
-                    summary_element = item.select_one(selector)
-                    if summary_element and summary_element.get_text(strip=True):
-                        break
-                
-                summary_text = summary_element.get_text(strip=True) if summary_element else ""
-                
-                # 从摘要中提取时间信息
-                time_str = ""
-                time_patterns = [
-                    r'(\d+)分钟前',
-                    r'(\d+)小时前',
-                    r'(\d+)天前',
-                    r'今天',
-                    r'昨天',
-                    r'(\d{1,2})月(\d{1,2})日',
-                    r'(\d{4})年(\d{1,2})月(\d{1,2})日'
-                ]
-                
-                # 首先检查摘要的开头是否包含时间信息
-                import re
-                for pattern in time_patterns:
-                    match = re.search(pattern, summary_text[:50])
-                    if match:
-                        time_str = match.group(0)
-                        # 从摘要中移除时间信息
-                        summary_text = summary_text[len(time_str):].strip()
-                        if summary_text.startswith('，'):
-                            summary_text = summary_text[1:].strip()
-                        break
-                
-                # 尝试多种可能的来源选择器
-                source = ""
-                for selector in ['div.c-author', 'div.source', 'span.source', 'div[class*="source"]']:
-                    source_element = item.select_one(selector)
-                    if source_element and source_element.get_text(strip=True):
-                        source = source_element.get_text(strip=True)
-                        break
-                
-                # 如果没有找到来源，尝试从摘要末尾提取
-                if not source and summary_text:
-                    # 查找最后一个包含常见新闻来源关键词的部分
-                    source_keywords = ['网', '报', '新闻', '日报', '周刊', '电视台', '通讯社']
-                    parts = summary_text.split('...')
-                    if len(parts) > 1:
-                        last_part = parts[-1].strip()
-                        if any(keyword in last_part for keyword in source_keywords):
-                            source = last_part
-                            # 从摘要中移除来源信息
-                            summary_text = '...'.join(parts[:-1]) + '...'
-                
-                # 构建结果字典
-                news_item = {
-                    'title': title,
-                    'url': url,
-                    'summary': summary_text.strip(),
-                    'source': source,
-                    'time': time_str
-                }
-                
-                results.append(news_item)
-                print(f"成功解析新闻: {title[:30]}...")
-                
-            except Exception as e:
-                print(f"解析新闻条目时出错: {str(e)}")
+    
+    if not news_items and mode == "targeted":
+        # 结果区域中没有匹配的条目，可能是页面结构变化，退回整页解析
+        return parse_search_results(html_content, verbose=verbose, now=now, mode="full", layout_cache=layout_cache)
+    
+    if not news_items:
+        # 如果没有找到任何新闻条目，尝试查找所有可能包含新闻的div，最多扫描出MAX_FALLBACK_ITEMS个
+        log("未找到新闻条目，尝试查找所有可能的新闻div...")
+        news_items = soup.find_all('div', class_=FALLBACK_CLASS_PATTERN, limit=MAX_FALLBACK_ITEMS)
+    
+    log(f"总共找到 {len(news_items)} 个可能的新闻条目")
+    
+    # 记录各字段命中的选择器，用于为新布局生成方案
+    winners = {'title': set(), 'summary': set(), 'source': set()}
+    
+    for item in news_items:
+        try:
+            # 尝试多种可能的标题选择器
+            title_element, _ = _select_field(item, 'title', plan, winners)
+            
+            if not title_element:
                 continue
-        
-        return results
+                
+            title = title_element.get_text(strip=True)
+            url = title_element.get('href', '')
+            
+            # 如果URL是相对路径，转换为绝对路径
+            if url.startswith('/'):
+                url = f"https://news.baidu.com{url}"
+            
+            # 尝试多种可能的摘要选择器
+            summary_element, _ = _select_field(item, 'summary', plan, winners)
+            
+            summary_text = summary_element.get_text(strip=True) if summary_element else ""
+            
+            # 从摘要中提取时间信息
+            time_str = ""
+            time_patterns = [
+                r'(\d+)分钟前',
+                r'(\d+)小时前',
+                r'(\d+)天前',
+                r'今天',
+                r'昨天',
+                r'(\d{1,2})月(\d{1,2})日',
+                r'(\d{4})年(\d{1,2})月(\d{1,2})日'
+            ]
+            
+            # 首先检查摘要的开头是否包含时间信息
+            for pattern in time_patterns:
+                match = re.search(pattern, summary_text[:50])
+                if match:
+                    time_str = match.group(0)
+                    # 从摘要中移除时间信息
+                    summary_text = summary_text[len(time_str):].strip()
+                    if summary_text.startswith('，'):
+                        summary_text = summary_text[1:].strip()
+                    break
+            
+            # 尝试多种可能的来源选择器
+            source_element, selector = _select_field(item, 'source', plan, winners)
+            source = source_element.get_text(strip=True) if selector else ""
+            
+            # 如果没有找到来源，尝试从摘要末尾提取
+            if not source and summary_text:
+                # 查找最后一个包含常见新闻来源关键词的部分
+                source_keywords = ['网', '报', '新闻', '日报', '周刊', '电视台', '通讯社']
+                parts = summary_text.split('...')
+                if len(parts) > 1:
+                    last_part = parts[-1].strip()
+                    if any(keyword in last_part for keyword in source_keywords):
+                        source = last_part
+                        # 从摘要中移除来源信息
+                        summary_text = '...'.join(parts[:-1]) + '...'
+            
+            # 把模糊时间转换为绝对时间
+            published_at = parse_news_time(time_str, now)
+            
+            # 构建结果字典
+            news_item = {
+                'title': title,
+                'url': url,
+                'summary': summary_text.strip(),
+                'source': source,
+                'time': time_str,
+                'published_at': published_at.isoformat() if published_at else ''
+            }
+            
+            results.append(news_item)
+            log(f"成功解析新闻: {title[:30]}...")
+            
+        except Exception as e:
+            log(f"解析新闻条目时出错: {str(e)}")
+            continue
+    
+    if layout_cache and plan is None and container_selector and results:
+        # 通过选择器（而不是兜底扫描）找到了新闻，为该布局保存方案
+        _store_plan(fingerprint, _build_plan(container_selector, winners))
+    
+    return results
+
+
+
+def _silent(*args, **kwargs):
+    """静默模式下丢弃日志输出"""
+    pass
 
 
 if __name__ == "__main__":
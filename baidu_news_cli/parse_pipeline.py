@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+并行解析流水线模块
+将网络抓取与HTML解析解耦：抓取线程把原始HTML字节放入有界队列，
+由进程池中的解析进程并行解析，最后按任务顺序重新组装结果。
+适用于成千上万页的批量抓取，解析吞吐量随CPU核数扩展。
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from news_searcher import parse_search_results, search_window
+
+
+def _parse_worker(raw_html):
+    """
+    解析进程的入口函数
+
+    Args:
+        raw_html (bytes): 原始HTML字节
+
+    Returns:
+        list: 搜索结果列表
+    """
+    return parse_search_results(raw_html.decode('utf-8', errors='replace'), verbose=False)
+
+
+class ParsePipeline:
+    """抓取/解析流水线"""
+
+    def __init__(self, searcher, fetch_workers=4, parse_workers=None, queue_size=32, delay=0.0, search_options=None):
+        """
+        初始化流水线
+
+        Args:
+            searcher (BaiduNewsSearcher): 用于下载页面的搜索器，多个抓取线程共享
+            fetch_workers (int): 抓取线程数
+            parse_workers (int): 解析进程数，默认为CPU核数
+            queue_size (int): 原始HTML队列容量，队列满时抓取线程阻塞（背压）
+            delay (float): 每个抓取线程两次请求之间的延迟时间（秒）
+            search_options (dict): 传递给 fetch_page 的时间范围和排序参数
+        """
+        self.searcher = searcher
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = max(1, queue_size)
+        self.delay = delay
+        self.search_options = search_options or {}
+
+    def _fetch_loop(self, tasks, task_queue, raw_queue, window, stop_event, skip):
+        """
+        抓取线程主循环
+
+        Args:
+            tasks (list): (关键词, 页码) 任务列表
+            task_queue (queue.Queue): 待抓取的任务序号
+            raw_queue (queue.Queue): 抓取结果队列，元素为 (序号, 原始HTML, 错误)，
+                                     原始HTML和错误都为None表示任务被跳过
+            window (threading.Semaphore): 已抓取但尚未交付的任务数上限
+            stop_event (threading.Event): 停止信号
+            skip (callable): 判断任务是否跳过的函数，可以为None
+        """
+        while not stop_event.is_set():
+            # 先占用窗口再取任务，保证任务按序号顺序被领取，
+            # 最小的未交付序号总在窗口内，重组时不会死锁
+            if not window.acquire(timeout=0.1):
+                continue
+            try:
+                seq = task_queue.get_nowait()
+            except queue.Empty:
+                window.release()
+                return
+
+            keywords, page = tasks[seq]
+            if skip is not None and skip(tasks[seq]):
+                item = (seq, None, None)
+            else:
+                try:
+                    raw_html = self.searcher.fetch_page(keywords, page=page, **self.search_options)
+                    item = (seq, raw_html, None)
+                except Exception as e:
+                    item = (seq, None, str(e))
+
+            while not stop_event.is_set():
+                try:
+                    raw_queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+            if self.delay and item[1] is not None:
+                time.sleep(self.delay)
+
+    def run(self, tasks, skip=None):
+        """
+        执行流水线
+
+        Args:
+            tasks (list): (关键词, 页码) 任务列表
+            skip (callable): 抓取线程在领取任务后调用 skip(任务)，返回True时不再抓取该任务，
+                             也不产出它；例如某个关键词已经提前停止翻页时跳过它后面的页
+
+        Yields:
+            tuple: (任务, 结果列表, 错误信息)，按任务在列表中的顺序产出；
+                   成功时错误信息为None，失败时结果列表为空
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return
+
+        task_queue = queue.Queue()
+        for seq in range(len(tasks)):
+            task_queue.put(seq)
+
+        raw_queue = queue.Queue(maxsize=self.queue_size)
+        # 窗口同时覆盖队列中、解析中以及等待重组的任务，限制整体内存占用
+        window = threading.Semaphore(self.queue_size + self.parse_workers * 2)
+        stop_event = threading.Event()
+
+        threads = []
+        for _ in range(min(self.fetch_workers, len(tasks))):
+            thread = threading.Thread(
+                target=self._fetch_loop,
+                args=(tasks, task_queue, raw_queue, window, stop_event, skip),
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        futures = {}
+        failed = {}
+        skipped = set()
+        next_seq = 0
+
+        def accept(item):
+            """登记一个抓取结果：失败、跳过或提交解析"""
+            seq, raw_html, error = item
+            if error is not None:
+                failed[seq] = error
+            elif raw_html is None:
+                skipped.add(seq)
+            else:
+                futures[seq] = pool.submit(_parse_worker, raw_html)
+
+        try:
+            while next_seq < len(tasks):
+                # 把已经抓取到的页面全部提交给解析进程
+                while True:
+                    try:
+                        accept(raw_queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if next_seq in skipped:
+                    skipped.discard(next_seq)
+                    window.release()
+                    next_seq += 1
+                    continue
+
+                if next_seq in failed:
+                    error = failed.pop(next_seq)
+                    window.release()
+                    yield tasks[next_seq], [], error
+                    next_seq += 1
+                    continue
+
+                future = futures.get(next_seq)
+                if future is None:
+                    # 下一个任务还在抓取中
+                    try:
+                        accept(raw_queue.get(timeout=0.05))
+                    except queue.Empty:
+                        pass
+                    continue
+
+                wait([future], timeout=0.05)
+                if not future.done():
+                    continue
+
+                del futures[next_seq]
+                window.release()
+                try:
+                    results = future.result()
+                except Exception as e:
+                    yield tasks[next_seq], [], f"解析失败: {str(e)}"
+                else:
+                    yield tasks[next_seq], results, None
+                next_seq += 1
+        finally:
+            stop_event.set()
+            for future in futures.values():
+                future.cancel()
+            pool.shutdown(wait=False)
+            for thread in threads:
+                thread.join(timeout=1)
+
+
+def pipeline_search(searcher, keywords, pages, since=None, until=None, sort=None, **kwargs):
+    """
+    使用流水线模式获取同一关键词的多页结果
+
+    设置了时间范围时，按时间范围过滤结果；按时间排序时，整页结果都早于起始时间后提前停止
+
+    Args:
+        searcher (BaiduNewsSearcher): 搜索器实例
+        keywords (str): 搜索关键词
+        pages (int): 要获取的页数
+        since: 起始时间
+        until: 截止时间
+        sort (str): 排序方式，设置了起始时间但未指定排序时按时间排序
+        **kwargs: 传递给 ParsePipeline 的其他参数
+
+    Yields:
+        tuple: (页码, 结果列表, 错误信息)
+    """
+    since, until, sort = search_window(since, until, sort)
+
+    search_options = {"since": since, "until": until, "sort": sort}
+    pipeline = ParsePipeline(searcher, search_options=search_options, **kwargs)
+    tasks = [(keywords, page) for page in range(1, pages + 1)]
+    outputs = pipeline.run(tasks)
+    try:
+        yield from searcher.filter_pages(
+            ((page, results, error) for (_, page), results, error in outputs),
+            since, until, sort,
+        )
+    finally:
+        # 提前停止时立即停止抓取线程和解析进程
+        outputs.close()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+正文抓取器的测试
+使用本机的HTTP服务器提供测试页面，访问本机地址时放开公网地址检查
+"""
+
+import os
+import sys
+import threading
+import unittest
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_utils
+from article_fetcher import ArticleFetcher
+
+PARAGRAPH = "这是一段用于测试的新闻正文，长度足够被识别为正文段落。"
+
+
+def article_html(charset_meta=""):
+    """构造文章页面"""
+    return (f"<html><head>{charset_meta}<title>测试标题</title></head>"
+            f"<body><div><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p></div></body></html>")
+
+
+PAGES = {
+    # 只在<meta>中声明字符集
+    "/meta-gbk": ("text/html", article_html('<meta charset="gbk">').encode("gbk")),
+    # 只在响应头中声明字符集
+    "/header-gbk": ("text/html; charset=gbk", article_html().encode("gbk")),
+    # 每个汉字3个字节，用于测试在多字节字符中间截断
+    "/long-utf8": ("text/html; charset=utf-8", ("<html><body><p>" + "中" * 2000 + "</p></body></html>").encode("utf-8")),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """按路径返回测试页面，/redirect 跳转到 /meta-gbk"""
+
+    requests = Counter()
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        Handler.requests[path] += 1
+        if path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/meta-gbk")
+            self.end_headers()
+            return
+        if path not in PAGES:
+            self.send_error(404)
+            return
+        content_type, body = PAGES[path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ArticleFetcherTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        Handler.requests.clear()
+        self.fetcher = ArticleFetcher(timeout=5, max_bytes=1000)
+        # 测试服务器在本机，放开公网地址检查
+        patcher = mock.patch.object(http_utils, "is_public_address", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.fetcher.session.close)
+
+    def test_charset_from_meta(self):
+        article = self.fetcher.fetch(self.base_url + "/meta-gbk")
+        self.assertIsNone(article["error"])
+        self.assertEqual(article["charset"], "gb18030")
+        self.assertEqual(article["title"], "测试标题")
+        self.assertIn(PARAGRAPH, article["text"])
+
+    def test_charset_from_header(self):
+        article = self.fetcher.fetch(self.base_url + "/header-gbk")
+        self.assertIsNone(article["error"])
+        self.assertEqual(article["charset"], "gb18030")
+        self.assertIn(PARAGRAPH, article["text"])
+
+    def test_truncates_on_multibyte_boundary(self):
+        article = self.fetcher.fetch(self.base_url + "/long-utf8")
+        self.assertIsNone(article["error"])
+        self.assertTrue(article["truncated"])
+        # 1000字节截断在汉字中间，不完整的字符被丢弃
+        self.assertTrue(article["text"])
+        self.assertNotIn("�", article["text"])
+        self.assertEqual(set(article["text"]), {"中"})
+
+    def test_follows_redirect_with_per_hop_host_limit(self):
+        limited = []
+        limit = self.fetcher.host_limiter.limit
+
+        def record(url):
+            limited.append(url)
+            return limit(url)
+
+        with mock.patch.object(self.fetcher.host_limiter, "limit", side_effect=record):
+            article = self.fetcher.fetch(self.base_url + "/redirect")
+        self.assertIsNone(article["error"])
+        self.assertEqual(article["final_url"], self.base_url + "/meta-gbk")
+        # 每一跳分别按所请求的URL占用并发名额
+        self.assertEqual(limited, [self.base_url + "/redirect", self.base_url + "/meta-gbk"])
+
+    def test_cache_hit_by_canonical_url(self):
+        first = self.fetcher.fetch(self.base_url + "/meta-gbk?utm_source=a")
+        second = self.fetcher.fetch(self.base_url + "/meta-gbk#comments")
+        many = self.fetcher.fetch_many([self.base_url + "/meta-gbk", self.base_url + "/meta-gbk?spm=1"])
+
+        self.assertEqual(Handler.requests["/meta-gbk"], 1)
+        self.assertEqual(second["text"], first["text"])
+        self.assertEqual(second["url"], self.base_url + "/meta-gbk#comments")
+        self.assertEqual([item["url"] for item in many],
+                         [self.base_url + "/meta-gbk", self.base_url + "/meta-gbk?spm=1"])
+
+
+class PublicAddressTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fetcher = ArticleFetcher(timeout=5)
+        self.addCleanup(self.fetcher.session.close)
+
+    def test_rejects_private_and_non_http_urls(self):
+        for url in ("http://127.0.0.1/", "http://localhost/", "http://10.0.0.1/",
+                    "http://169.254.169.254/latest/meta-data/", "http://[::1]/", "file:///etc/passwd"):
+            article = self.fetcher.fetch(url)
+            self.assertIsNotNone(article["error"], url)
+            self.assertEqual(article["text"], "")
+
+    def test_connection_to_private_address_is_refused(self):
+        # 即使URL检查被绕过（如DNS重绑定），连接本机地址时也会被拒绝
+        Handler.requests.clear()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            with mock.patch("article_fetcher.check_public_url"):
+                article = self.fetcher.fetch(f"http://127.0.0.1:{server.server_port}/meta-gbk")
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("非公网地址", article["error"])
+        self.assertEqual(Handler.requests["/meta-gbk"], 0)
+
+    def test_public_address_check(self):
+        self.assertTrue(http_utils.is_public_address("8.8.8.8"))
+        for address in ("127.0.0.1", "10.1.2.3", "192.168.1.1", "169.254.169.254", "::1", "fd00::1",
+                        "::ffff:127.0.0.1", "0.0.0.0", "not-an-ip"):
+            self.assertFalse(http_utils.is_public_address(address), address)
+
+
+if __name__ == "__main__":
+    unittest.main()
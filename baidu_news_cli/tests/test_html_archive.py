@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+原始HTML存档的测试
+覆盖 追加 → 读取索引 → 读取页面 → 重新解析 的完整流程（未安装 zstandard 时跳过）
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_archive
+from html_archive import HtmlArchive, reparse_archive
+from news_searcher import parse_search_results
+
+
+def make_page(keyword, count):
+    """构造搜索结果页面"""
+    items = ''.join(
+        f'<div class="result-op c-container"><h3><a href="https://example.com/{keyword}/{i}">{keyword}新闻{i}</a></h3>'
+        f'<div class="c-summary">2小时前 {keyword}摘要{i}</div><span class="c-color-gray">来源{i}</span></div>'
+        for i in range(count)
+    )
+    return f'<html><body><div id="content_left">{items}</div></body></html>'.encode('utf-8')
+
+
+@unittest.skipIf(html_archive.zstandard is None, "需要安装 zstandard")
+class HtmlArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.archive = HtmlArchive(os.path.join(self.tmpdir.name, "archive", "news"))
+        self.addCleanup(self.archive.close)
+        self.pages = [(f"关键词{i}", page, make_page(f"kw{i}", page + 1)) for i in range(4) for page in (1, 2)]
+        for keywords, page, raw_html in self.pages:
+            self.archive.append(raw_html, keywords=keywords, page=page, url=f"https://www.baidu.com/s?pn={page}")
+
+    def test_append_then_read(self):
+        records = self.archive.records()
+        self.assertEqual([(r["keywords"], r["page"]) for r in records], [(k, p) for k, p, _ in self.pages])
+        for record, (_, _, raw_html) in zip(records, self.pages):
+            self.assertEqual(record["raw_length"], len(raw_html))
+            self.assertEqual(self.archive.read(record), raw_html)
+
+    def test_read_after_segment_grows(self):
+        first = self.archive.records()[0]
+        self.archive.read(first)
+        record = self.archive.append(make_page("late", 1), keywords="追加", page=1)
+        self.assertEqual(self.archive.read(record), make_page("late", 1))
+
+    def test_reparse_matches_direct_parse(self):
+        # 窗口小于页面数，验证分批提交后仍按写入顺序产出
+        reparsed = list(reparse_archive(self.archive, workers=2, window=3))
+        self.assertEqual([(r["keywords"], r["page"]) for r, _ in reparsed], [(k, p) for k, p, _ in self.pages])
+        for (record, results), (_, page, raw_html) in zip(reparsed, self.pages):
+            self.assertEqual(len(results), page + 1)
+            self.assertEqual([item["url"] for item in results],
+                             [item["url"] for item in parse_search_results(raw_html.decode('utf-8'), verbose=False)])
+
+    def test_reparse_stops_early(self):
+        reparsed = reparse_archive(self.archive, workers=2, window=2)
+        record, _ = next(reparsed)
+        reparsed.close()
+        self.assertEqual(record["keywords"], self.pages[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
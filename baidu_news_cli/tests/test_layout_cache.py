@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+选择器方案缓存的测试
+同一页面无论缓存中已有哪些布局的方案，解析结果都必须相同
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_searcher import (FINGERPRINT_CHARS, get_layout_stats, layout_fingerprint,
+                           parse_search_results, reset_layout_cache)
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def make_page(items):
+    """构造只包含结果区域的搜索结果页面"""
+    return ('<html><body><div id="content_left">'
+            + ''.join(f'<div class="result-op c-container">{item}</div>' for item in items)
+            + '</div></body></html>')
+
+
+# 页面A：条目中只有普通链接，没有<h3>
+PAGE_A = make_page(
+    f'<a href="/plain{i}">标题{i}</a><div class="c-summary">3小时前 摘要{i}</div>' for i in range(5)
+)
+
+# 页面B：与页面A布局相同，但条目中的<h3>链接优先级更高
+PAGE_B = make_page([
+    '<a href="/ad">广告</a><h3><a href="/real">Real title</a></h3><div class="c-summary">摘要</div>',
+    '<h3><a href="/other">Other title</a></h3><div class="c-summary">昨天 摘要</div>',
+])
+
+# 页面C：另一种布局，带来源
+PAGE_C = make_page(
+    f'<h3><a href="https://example.com/{i}">新闻{i}</a></h3><div class="content">摘要{i}</div>'
+    f'<span class="source">来源{i}</span>' for i in range(3)
+)
+
+# 页面D：与页面A布局相同的长页面，指纹扫描范围之外的最后一条新闻只有<p>摘要
+LONG_ITEM = '<a href="/long{i}">长标题{i}</a><div class="c-summary">摘要' + '很长' * 500 + '</div>'
+LONG_ITEMS = [LONG_ITEM.format(i=i) for i in range(FINGERPRINT_CHARS // 1000 + 2)]
+PAGE_D = make_page(LONG_ITEMS + ['<a href="/last">最后一条</a><div class="c-summary"></div><p>段落摘要</p>'])
+PAGE_D_PLAIN = make_page(LONG_ITEMS)
+
+PAGES = [PAGE_A, PAGE_B, PAGE_C, PAGE_D, PAGE_D_PLAIN]
+
+
+def cold_parse(html_content, mode="targeted"):
+    """在空缓存下解析页面"""
+    reset_layout_cache()
+    return parse_search_results(html_content, verbose=False, now=NOW, mode=mode)
+
+
+class LayoutCacheTest(unittest.TestCase):
+
+    def tearDown(self):
+        reset_layout_cache()
+
+    def test_item_structure_changes_fingerprint(self):
+        self.assertNotEqual(layout_fingerprint(PAGE_A), layout_fingerprint(PAGE_B))
+        self.assertEqual(layout_fingerprint(PAGE_D), layout_fingerprint(PAGE_D_PLAIN))
+
+    def test_known_layout_uses_cached_plan(self):
+        reset_layout_cache()
+        first = parse_search_results(PAGE_A, verbose=False, now=NOW)
+        second = parse_search_results(PAGE_A, verbose=False, now=NOW)
+
+        self.assertEqual(first, second)
+        stats = get_layout_stats()
+        self.assertEqual(stats['plan_hits'], 1)
+        self.assertEqual(stats['item_fallbacks'], 0)
+
+    def test_item_falls_back_when_cached_selector_misses(self):
+        reset_layout_cache()
+        parse_search_results(PAGE_D_PLAIN, verbose=False, now=NOW)
+        results = parse_search_results(PAGE_D, verbose=False, now=NOW)
+
+        self.assertEqual(get_layout_stats()['plan_hits'], 1)
+        self.assertEqual(get_layout_stats()['item_fallbacks'], 1)
+        self.assertEqual(results, cold_parse(PAGE_D))
+        self.assertEqual(results[-1]['summary'], '段落摘要')
+
+    def test_warm_cache_matches_cold_cache(self):
+        for mode in ("targeted", "full"):
+            expected = [cold_parse(page, mode) for page in PAGES]
+
+            # 以不同顺序解析，每个页面都在缓存已有其他页面方案的情况下解析
+            for order in ([0, 1, 2], [2, 1, 0], [1, 0, 2, 1, 0]):
+                reset_layout_cache()
+                for index in order:
+                    results = parse_search_results(PAGES[index], verbose=False, now=NOW, mode=mode)
+                    self.assertEqual(results, expected[index], f"mode={mode}, order={order}")
+
+    def test_higher_priority_selector_wins_after_warm_up(self):
+        reset_layout_cache()
+        parse_search_results(PAGE_A, verbose=False, now=NOW)
+        results = parse_search_results(PAGE_B, verbose=False, now=NOW)
+
+        self.assertEqual(results[0]['title'], 'Real title')
+        self.assertEqual(results[0]['url'], 'https://news.baidu.com/real')
+
+
+if __name__ == "__main__":
+    unittest.main()
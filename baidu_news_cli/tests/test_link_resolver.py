@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+链接解析器的测试
+使用本机的HTTP服务器模拟跳转，只放开本机地址的公网地址检查
+"""
+
+import os
+import sys
+import threading
+import unittest
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_utils
+from link_resolver import LinkResolver, find_refresh_target
+
+# 路径 -> 跳转目标
+REDIRECTS = {
+    "/start": "/middle",
+    "/middle": "/article",
+    "/to-private": "http://10.0.0.1/secret",
+    "/to-metadata": "http://169.254.169.254/latest/meta-data/",
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """按 REDIRECTS 返回302跳转，其他路径返回200"""
+
+    requests = Counter()
+
+    def _respond(self):
+        path = urllib.parse.urlsplit(self.path).path
+        Handler.requests[path] += 1
+        if path in REDIRECTS:
+            self.send_response(302)
+            self.send_header("Location", REDIRECTS[path])
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_HEAD = _respond
+    do_GET = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RefreshPatternTest(unittest.TestCase):
+
+    def test_meta_refresh_in_either_attribute_order(self):
+        self.assertEqual(find_refresh_target('<meta http-equiv="refresh" content="0;URL=\'https://a.com/x?y=1\'">'),
+                         "https://a.com/x?y=1")
+        self.assertEqual(find_refresh_target('<META content="0; url=https://b.com/" HTTP-EQUIV="Refresh">'),
+                         "https://b.com/")
+
+    def test_script_redirect(self):
+        self.assertEqual(find_refresh_target('<script>window.location.replace("https://c.com/")</script>'),
+                         "https://c.com/")
+        self.assertEqual(find_refresh_target("<script>location.href = '/relative'</script>"), "/relative")
+
+    def test_url_outside_meta_refresh_is_ignored(self):
+        self.assertIsNone(find_refresh_target('<a href="/s?word=x&URL=https://evil.com/">链接</a>'))
+        self.assertIsNone(find_refresh_target('<meta name="description" content="0;URL=https://evil.com/">'))
+        self.assertIsNone(find_refresh_target('<p>访问 URL=https://evil.com/ 查看</p>'))
+
+
+class LinkResolverTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        Handler.requests.clear()
+        self.resolver = LinkResolver(cache_path=None, timeout=5)
+        self.addCleanup(self.resolver.close)
+
+    def allow_local_server(self):
+        """只把测试服务器所在的本机地址视为公网地址"""
+        is_public = http_utils.is_public_address
+        patcher = mock.patch.object(http_utils, "is_public_address",
+                                    side_effect=lambda address: address == "127.0.0.1" or is_public(address))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_follows_redirect_chain(self):
+        self.allow_local_server()
+        self.assertEqual(self.resolver.resolve(self.base_url + "/start"), self.base_url + "/article")
+
+    def test_private_url_is_not_requested(self):
+        self.assertEqual(self.resolver.resolve(self.base_url + "/start"), self.base_url + "/start")
+        self.assertEqual(sum(Handler.requests.values()), 0)
+
+    def test_redirect_to_private_address_is_not_followed(self):
+        self.allow_local_server()
+        for path in ("/to-private", "/to-metadata"):
+            with mock.patch.object(self.resolver.session, "head", wraps=self.resolver.session.head) as head:
+                self.resolver.resolve(self.base_url + path)
+            # 只请求了测试服务器，没有向跳转目标发出请求
+            self.assertEqual([call.args[0] for call in head.call_args_list], [self.base_url + path])
+
+    def test_connection_to_private_address_is_refused(self):
+        # 即使URL检查被绕过（如DNS重绑定），连接本机地址时也会被拒绝
+        with mock.patch("link_resolver.check_public_url"):
+            self.assertEqual(self.resolver.resolve(self.base_url + "/start"), self.base_url + "/start")
+        self.assertEqual(sum(Handler.requests.values()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
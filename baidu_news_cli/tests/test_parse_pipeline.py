@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+抓取/解析流水线的测试
+用返回固定页面的搜索器代替网络请求，覆盖按序重组、抓取失败、解析失败、跳过任务和提前停止
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_runner import STATUS_DONE, STATUS_FAILED, BatchRunner, BatchState, ShardWriter
+from news_searcher import BaiduNewsSearcher
+from parse_pipeline import ParsePipeline, pipeline_search
+
+
+def make_page(keywords, page, age="2小时前"):
+    """构造一页只有一条结果的搜索结果页面"""
+    return ('<html><body><div id="content_left"><div class="result-op c-container">'
+            f'<h3><a href="https://example.com/{keywords}/{page}">{keywords} 第{page}页</a></h3>'
+            f'<div class="c-summary">{age} 摘要</div></div></div></body></html>').encode('utf-8')
+
+
+class FakeSearcher(BaiduNewsSearcher):
+    """
+    不访问网络的搜索器
+
+    关键词为 bad 时第2页抓取失败，为 broken 时第2页返回无法解析的数据；
+    关键词为 old 时第2页起结果都是3天前的；页码越小抓取越慢，使抓取完成的顺序与任务顺序相反
+    """
+
+    def __init__(self):
+        super().__init__(verbose=False)
+        self.fetched = Counter()
+        self._fetch_lock = threading.Lock()
+
+    def fetch_page(self, keywords, page=1, since=None, until=None, sort=None):
+        with self._fetch_lock:
+            self.fetched[(keywords, page)] += 1
+        time.sleep(max(0, 5 - page) * 0.01)
+        if keywords == "bad" and page == 2:
+            raise Exception("搜索请求失败: 503")
+        if keywords == "broken" and page == 2:
+            # 不是bytes，解析进程中解码失败
+            return "broken"
+        return make_page(keywords, page, "3天前" if keywords == "old" and page >= 2 else "2小时前")
+
+
+class ParsePipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.searcher = FakeSearcher()
+        self.addCleanup(self.searcher.close)
+
+    def run_pipeline(self, tasks, **kwargs):
+        pipeline = ParsePipeline(self.searcher, fetch_workers=4, parse_workers=2, queue_size=2)
+        return list(pipeline.run(tasks, **kwargs))
+
+    def test_results_are_reassembled_in_task_order(self):
+        tasks = [(keywords, page) for keywords in ("ai", "ml") for page in range(1, 6)]
+        outputs = self.run_pipeline(tasks)
+
+        self.assertEqual([task for task, _, _ in outputs], tasks)
+        for (keywords, page), results, error in outputs:
+            self.assertIsNone(error)
+            self.assertEqual([item['url'] for item in results], [f"https://example.com/{keywords}/{page}"])
+
+    def test_fetch_error_is_reported_in_place(self):
+        outputs = self.run_pipeline([("bad", page) for page in range(1, 4)])
+
+        self.assertEqual([task for task, _, _ in outputs], [("bad", 1), ("bad", 2), ("bad", 3)])
+        self.assertEqual(outputs[1][1:], ([], "搜索请求失败: 503"))
+        self.assertIsNone(outputs[0][2])
+        self.assertIsNone(outputs[2][2])
+
+    def test_parse_error_is_reported_in_place(self):
+        outputs = self.run_pipeline([("broken", page) for page in range(1, 4)])
+
+        self.assertEqual([task for task, _, _ in outputs], [("broken", 1), ("broken", 2), ("broken", 3)])
+        self.assertEqual(outputs[1][1], [])
+        self.assertTrue(outputs[1][2].startswith("解析失败"))
+        self.assertEqual(len(outputs[2][1]), 1)
+
+    def test_skipped_tasks_are_neither_fetched_nor_yielded(self):
+        tasks = [("ai", page) for page in range(1, 7)]
+        outputs = self.run_pipeline(tasks, skip=lambda task: task[1] % 2 == 0)
+
+        self.assertEqual([task for task, _, _ in outputs], [("ai", 1), ("ai", 3), ("ai", 5)])
+        self.assertEqual(sorted(self.searcher.fetched), [("ai", 1), ("ai", 3), ("ai", 5)])
+
+    def test_pipeline_search_stops_after_window(self):
+        pages = list(pipeline_search(self.searcher, "old", 5, since="24h", fetch_workers=2, parse_workers=2))
+
+        # 第2页的结果全部早于起始时间：该页被过滤为空，之后不再产出
+        self.assertEqual([(page, len(results), error) for page, results, error in pages],
+                         [(1, 1, None), (2, 0, None)])
+
+    def test_pipeline_search_keeps_paging_without_time_sort(self):
+        pages = list(pipeline_search(self.searcher, "old", 4, since="24h", sort="relevance",
+                                     fetch_workers=2, parse_workers=2))
+        self.assertEqual([page for page, _, _ in pages], [1, 2, 3, 4])
+
+
+class BatchRunnerPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.searcher = FakeSearcher()
+        self.addCleanup(self.searcher.close)
+        self.state = BatchState(os.path.join(self.tmpdir.name, "state.db"))
+        self.addCleanup(self.state.close)
+
+    def test_batch_runs_through_pipeline(self):
+        writer = ShardWriter(os.path.join(self.tmpdir.name, "out"), self.state)
+        runner = BatchRunner(self.searcher, self.state, writer, pages=4, concurrency=2, delay=0,
+                             since="24h", parse_workers=2)
+        self.state.begin_job({"pages": 4})
+        stats = runner.run(["ai", "bad", "old", "ml"])
+
+        self.assertEqual((stats["done"], stats["failed"]), (3, 1))
+        statuses = dict(self.state.conn.execute("SELECT keyword, status FROM keywords"))
+        self.assertEqual(statuses, {"ai": STATUS_DONE, "bad": STATUS_FAILED, "old": STATUS_DONE, "ml": STATUS_DONE})
+
+        pages = dict(self.state.conn.execute("SELECT keyword, pages FROM keywords"))
+        self.assertEqual((pages["ai"], pages["old"], pages["ml"]), (4, 2, 4))
+        self.assertEqual(stats["results"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
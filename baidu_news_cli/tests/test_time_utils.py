@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+时间处理模块的测试
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from time_utils import filter_by_time, news_time_range, parse_news_time, parse_time_bound
+
+NOW = datetime(2025, 6, 15, 12, 30)
+
+
+class NewsTimeRangeTest(unittest.TestCase):
+
+    def test_table(self):
+        cases = [
+            ("5分钟前", datetime(2025, 6, 15, 12, 24), datetime(2025, 6, 15, 12, 25)),
+            ("3小时前", datetime(2025, 6, 15, 8, 30), datetime(2025, 6, 15, 9, 30)),
+            ("2天前", datetime(2025, 6, 12, 12, 30), datetime(2025, 6, 13, 12, 30)),
+            ("今天 08:00", datetime(2025, 6, 15), datetime(2025, 6, 16)),
+            ("昨天", datetime(2025, 6, 14), datetime(2025, 6, 15)),
+            ("前天", datetime(2025, 6, 13), datetime(2025, 6, 14)),
+            ("6月1日", datetime(2025, 6, 1), datetime(2025, 6, 2)),
+            ("6月1日 09:15", datetime(2025, 6, 1, 9, 15), datetime(2025, 6, 1, 9, 16)),
+            ("2024年12月31日", datetime(2024, 12, 31), datetime(2025, 1, 1)),
+            ("2025-06-01", datetime(2025, 6, 1), datetime(2025, 6, 2)),
+            ("2025-06-01 10:00", datetime(2025, 6, 1, 10), datetime(2025, 6, 1, 10, 1)),
+        ]
+        for time_str, start, end in cases:
+            self.assertEqual(news_time_range(time_str, NOW), (start, end), time_str)
+
+    def test_unrecognized(self):
+        for time_str in ("", None, "刚刚更新", "2月30日", "2025年13月1日"):
+            self.assertIsNone(news_time_range(time_str, NOW), time_str)
+
+    def test_month_day_year_rollover(self):
+        # 不带年份的日期晚于当前时间时属于去年
+        new_year = datetime(2026, 1, 1, 10, 0)
+        cases = [
+            ("12月31日", datetime(2025, 12, 31)),
+            ("12月31日 23:59", datetime(2025, 12, 31, 23, 59)),
+            ("1月1日", datetime(2026, 1, 1)),
+            ("1月2日", datetime(2025, 1, 2)),
+        ]
+        for time_str, start in cases:
+            self.assertEqual(parse_news_time(time_str, new_year), start, time_str)
+
+
+class ParseTimeBoundTest(unittest.TestCase):
+
+    def test_start_bounds(self):
+        cases = [
+            (None, None),
+            ("", None),
+            (datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 8)),
+            ("2025-06-01", datetime(2025, 6, 1)),
+            ("2025-06-01 12:00", datetime(2025, 6, 1, 12)),
+            ("30m", datetime(2025, 6, 15, 12)),
+            ("12h", datetime(2025, 6, 15, 0, 30)),
+            ("7D", datetime(2025, 6, 8, 12, 30)),
+            ("今天", datetime(2025, 6, 15)),
+            ("昨天", datetime(2025, 6, 14)),
+            ("3小时前", datetime(2025, 6, 15, 8, 30)),
+        ]
+        for value, expected in cases:
+            self.assertEqual(parse_time_bound(value, NOW), expected, value)
+
+    def test_end_bounds(self):
+        cases = [
+            (None, None),
+            (datetime(2025, 1, 1, 8), datetime(2025, 1, 1, 8)),
+            ("2025-06-01", datetime(2025, 6, 2)),
+            ("2025-06-01 12:00", datetime(2025, 6, 1, 12)),
+            ("12h", datetime(2025, 6, 15, 0, 30)),
+            ("今天", datetime(2025, 6, 16)),
+            ("昨天", datetime(2025, 6, 15)),
+            ("6月1日", datetime(2025, 6, 2)),
+        ]
+        for value, expected in cases:
+            self.assertEqual(parse_time_bound(value, NOW, end=True), expected, value)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_time_bound("下周", NOW)
+
+
+class FilterByTimeTest(unittest.TestCase):
+
+    def items(self, *times):
+        return [{"title": str(i), "time": time_str} for i, time_str in enumerate(times)]
+
+    def test_no_bounds_keeps_everything(self):
+        results = self.items("3小时前", "")
+        self.assertEqual(filter_by_time(results, now=NOW), (results, False))
+
+    def test_until_today_keeps_recent_items(self):
+        results = self.items("3小时前", "昨天")
+        kept, past_window = filter_by_time(
+            results, until=parse_time_bound("今天", NOW, end=True), now=NOW
+        )
+        self.assertEqual([item["time"] for item in kept], ["3小时前", "昨天"])
+        self.assertFalse(past_window)
+
+    def test_since_filters_and_reports_past_window(self):
+        since = parse_time_bound("24h", NOW)
+        kept, past_window = filter_by_time(self.items("3小时前", "2天前", ""), since=since, now=NOW)
+        # 时间未知的结果予以保留
+        self.assertEqual([item["time"] for item in kept], ["3小时前", ""])
+        self.assertFalse(past_window)
+
+        kept, past_window = filter_by_time(self.items("2天前", "6月1日", ""), since=since, now=NOW)
+        self.assertEqual([item["time"] for item in kept], [""])
+        self.assertTrue(past_window)
+
+    def test_until_excludes_newer_items(self):
+        until = parse_time_bound("2025-06-14", NOW, end=True)
+        kept, _ = filter_by_time(self.items("3小时前", "昨天", "6月1日"), until=until, now=NOW)
+        self.assertEqual([item["time"] for item in kept], ["昨天", "6月1日"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+工作队列的测试
+SQLite队列使用临时文件；Redis队列使用本地替身 fakeredis（未安装 fakeredis 和 lupa 时跳过）
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from work_queue import RedisWorkQueue, SQLiteWorkQueue, run_worker
+
+try:
+    import fakeredis
+    import lupa  # noqa: F401  fakeredis 执行Lua脚本需要 lupa
+except ImportError:
+    fakeredis = None
+
+
+class FakeSearcher:
+    """按关键词返回固定结果的搜索器，关键词为 bad 时重试一次后抛出异常"""
+
+    def __init__(self):
+        self.before_request = None
+        self.requests = 0
+        self.calls = []
+
+    def _request(self):
+        if self.before_request is not None:
+            self.before_request()
+        self.requests += 1
+
+    def search(self, keyword, page=1, since=None, until=None, sort=None):
+        self.calls.append((keyword, page, since, until, sort))
+        self._request()
+        if keyword == "bad":
+            self._request()
+            raise RuntimeError("boom")
+        return [{"url": f"https://example.com/{keyword}/{page}", "title": f"{keyword} {page}"}]
+
+
+class WorkQueueTests:
+    """两种队列共用的测试，子类实现 make_queue"""
+
+    def make_queue(self, max_attempts=2):
+        raise NotImplementedError
+
+    def test_enqueue_is_deduplicated(self):
+        queue = self.make_queue()
+        self.assertEqual(queue.enqueue("ai", 2), 2)
+        self.assertEqual(queue.enqueue("ai", 3), 1)
+        self.assertEqual(queue.stats()["pending"], 3)
+
+    def test_new_window_adds_tasks(self):
+        queue = self.make_queue()
+        queue.enqueue("ai", 2)
+        self.assertEqual(queue.enqueue("ai", 2, since=datetime(2025, 6, 1), until=datetime(2025, 6, 2)), 2)
+        self.assertEqual(queue.enqueue("ai", 2, since=datetime(2025, 6, 1), until=datetime(2025, 6, 2)), 0)
+        self.assertEqual(queue.enqueue("ai", 2, since=datetime(2025, 6, 2), until=datetime(2025, 6, 3)), 2)
+        self.assertEqual(queue.enqueue("ai", 2, since=datetime(2025, 6, 2), until=datetime(2025, 6, 3), sort="time"), 2)
+        self.assertEqual(queue.stats()["pending"], 8)
+
+    def test_only_lease_holder_can_complete(self):
+        queue = self.make_queue()
+        queue.enqueue("ai", 1)
+        task = queue.lease("w1")
+
+        self.assertFalse(queue.complete(task, "w2", [{"url": "u"}]))
+        self.assertTrue(queue.complete(task, "w1", [{"url": "u"}]))
+        self.assertIsNone(queue.lease("w1"))
+        self.assertEqual(queue.stats()["done"], 1)
+        self.assertEqual(queue.stats()["results"], 1)
+
+    def test_expired_lease_is_leased_again(self):
+        queue = self.make_queue()
+        queue.enqueue("ai", 1)
+        task = queue.lease("w1", lease_seconds=0.01)
+        time.sleep(0.05)
+
+        again = queue.lease("w2")
+        self.assertEqual(again["task_id"], task["task_id"])
+        self.assertEqual(again["attempts"], 2)
+        # 原持有者的租约已失效，提交无效
+        self.assertFalse(queue.complete(task, "w1", []))
+        self.assertTrue(queue.complete(again, "w2", []))
+
+    def test_failed_task_is_retried_then_given_up(self):
+        queue = self.make_queue(max_attempts=2)
+        queue.enqueue("ai", 1)
+
+        queue.fail(queue.lease("w1"), "w1", "boom")
+        self.assertEqual(queue.stats()["pending"], 1)
+        queue.fail(queue.lease("w1"), "w1", "boom")
+        self.assertEqual(queue.stats()["failed"], 1)
+        self.assertIsNone(queue.lease("w1"))
+
+    def test_run_worker_drains_queue(self):
+        queue = self.make_queue()
+        queue.set_rate(1000)
+        queue.enqueue("ai", 2)
+        queue.enqueue("bad", 1)
+
+        searcher = FakeSearcher()
+        stats = run_worker(queue, searcher, worker_id="w1", poll_interval=0.01)
+        self.assertEqual(stats["done"], 2)
+        self.assertEqual(stats["failed"], 2)
+        self.assertEqual(queue.stats()["failed"], 1)
+        self.assertEqual(sorted(item["page"] for item in queue.iter_results()), [1, 2])
+        self.assertIsNone(searcher.before_request)
+
+    def test_rate_quota_is_taken_per_request(self):
+        queue = self.make_queue()
+        queue.set_rate(1000)
+        queue.enqueue("ai", 2)
+        queue.enqueue("bad", 1)
+
+        acquired = []
+        acquire_rate = queue.acquire_rate
+        queue.acquire_rate = lambda: acquired.append(1) or acquire_rate()
+
+        searcher = FakeSearcher()
+        run_worker(queue, searcher, worker_id="w1", poll_interval=0.01)
+        # 2个正常任务各1次请求，失败的任务尝试2次、每次重试1次；队列空后多取得的1次配额未使用
+        self.assertEqual(searcher.requests, 6)
+        self.assertEqual(len(acquired), searcher.requests + 1)
+
+    def test_worker_uses_task_window(self):
+        queue = self.make_queue()
+        queue.set_rate(1000)
+        since, until = datetime(2025, 6, 1), datetime(2025, 6, 2)
+        queue.enqueue("ai", 1, since=since, until=until, sort="time")
+        queue.enqueue("ml", 1)
+
+        searcher = FakeSearcher()
+        run_worker(queue, searcher, worker_id="w1", poll_interval=0.01)
+        self.assertEqual(sorted(searcher.calls), [("ai", 1, since, until, "time"), ("ml", 1, None, None, None)])
+
+
+class SQLiteWorkQueueTest(WorkQueueTests, unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queues = []
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.close()
+        self.tmpdir.cleanup()
+
+    def make_queue(self, max_attempts=2):
+        queue = SQLiteWorkQueue(os.path.join(self.tmpdir.name, "queue.db"), max_attempts=max_attempts)
+        self.queues.append(queue)
+        return queue
+
+    def test_old_queue_is_upgraded(self):
+        path = os.path.join(self.tmpdir.name, "queue.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE tasks (task_id TEXT PRIMARY KEY, keyword TEXT NOT NULL, page INTEGER NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, lease_owner TEXT,"
+            " lease_expires REAL, error TEXT, created_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO tasks (task_id, keyword, page, status, created_at) VALUES ('t', 'ai', 1, 'pending', 0)")
+        conn.commit()
+        conn.close()
+
+        queue = self.make_queue()
+        task = queue.lease("w1")
+        self.assertEqual((task["keyword"], task["since"], task["sort"]), ("ai", None, None))
+        self.assertEqual(queue.enqueue("ai", 1, sort="time"), 1)
+
+
+@unittest.skipIf(fakeredis is None, "需要安装 fakeredis 和 lupa")
+class RedisWorkQueueTest(WorkQueueTests, unittest.TestCase):
+
+    def make_queue(self, max_attempts=2):
+        return RedisWorkQueue(fakeredis.FakeRedis(), max_attempts=max_attempts)
+
+    def test_leased_task_is_tracked(self):
+        queue = self.make_queue()
+        queue.enqueue("ai", 1)
+        task = queue.lease("w1")
+
+        # 领取后任务必须已经在租约集合中，而不是只从等待队列中移除
+        expires = queue.client.zscore(queue._key("leases"), task["task_id"])
+        self.assertIsNotNone(expires)
+        self.assertEqual(queue.stats()["leased"], 1)
+
+        # 租约到期时间按服务器时钟计算
+        seconds, microseconds = queue.client.time()
+        self.assertAlmostEqual(expires, seconds + microseconds / 1000000 + 120, delta=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+时间处理模块
+把百度新闻中的模糊时间（如"9小时前"、"昨天"）转换为绝对时间，
+解析命令行和MCP工具传入的时间范围，并按时间范围过滤搜索结果
+"""
+
+import re
+from datetime import datetime, timedelta
+
+# 相对时间单位 -> (正则, 时间单位)
+RELATIVE_PATTERNS = [
+    (re.compile(r'(\d+)\s*分钟前'), timedelta(minutes=1)),
+    (re.compile(r'(\d+)\s*小时前'), timedelta(hours=1)),
+    (re.compile(r'(\d+)\s*天前'), timedelta(days=1)),
+]
+
+FULL_DATE_PATTERN = re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日(?:\s*(\d{1,2}):(\d{2}))?')
+MONTH_DAY_PATTERN = re.compile(r'(\d{1,2})月(\d{1,2})日(?:\s*(\d{1,2}):(\d{2}))?')
+
+# 命令行中的简写相对时间，如 30m、12h、7d
+SHORT_RELATIVE_PATTERN = re.compile(r'^(\d+)\s*([mhd])$', re.I)
+SHORT_UNITS = {
+    'm': timedelta(minutes=1),
+    'h': timedelta(hours=1),
+    'd': timedelta(days=1),
+}
+
+
+def _start_of_day(moment):
+    """返回当天零点"""
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def news_time_range(time_str, now=None):
+    """
+    把百度新闻的时间字符串转换为绝对时间区间
+
+    模糊时间只能精确到某个单位，因此返回该时间可能落在的区间，
+    例如"昨天"对应昨天零点到今天零点
+
+    Args:
+        time_str (str): 时间字符串，如"9小时前"、"昨天"、"6月1日"、"2025年6月1日"
+        now (datetime): 参照时间，默认为当前时间
+
+    Returns:
+        tuple: (最早时间, 最晚时间)，无法识别时返回None
+    """
+    if not time_str:
+        return None
+    now = now or datetime.now()
+    time_str = time_str.strip()
+
+    for pattern, unit in RELATIVE_PATTERNS:
+        match = pattern.search(time_str)
+        if match:
+            start = now - unit * (int(match.group(1)) + 1)
+            return start, start + unit
+
+    if '今天' in time_str:
+        start = _start_of_day(now)
+        return start, start + timedelta(days=1)
+    if '昨天' in time_str:
+        start = _start_of_day(now) - timedelta(days=1)
+        return start, start + timedelta(days=1)
+    if '前天' in time_str:
+        start = _start_of_day(now) - timedelta(days=2)
+        return start, start + timedelta(days=1)
+
+    match = FULL_DATE_PATTERN.search(time_str)
+    if match:
+        year, month, day, hour, minute = match.groups()
+        return _date_range(int(year), int(month), int(day), hour, minute)
+
+    match = MONTH_DAY_PATTERN.search(time_str)
+    if match:
+        month, day, hour, minute = match.groups()
+        result = _date_range(now.year, int(month), int(day), hour, minute)
+        # 不带年份的日期晚于当前时间时，说明是去年的新闻
+        if result and result[0] > now:
+            result = _date_range(now.year - 1, int(month), int(day), hour, minute)
+        return result
+
+    try:
+        moment = datetime.fromisoformat(time_str)
+    except ValueError:
+        return None
+    if len(time_str) <= 10:
+        return moment, moment + timedelta(days=1)
+    return moment, moment + timedelta(minutes=1)
+
+
+def _date_range(year, month, day, hour=None, minute=None):
+    """根据日期（和可选的时分）构造时间区间，日期无效时返回None"""
+    try:
+        if hour is not None:
+            start = datetime(year, month, day, int(hour), int(minute))
+            return start, start + timedelta(minutes=1)
+        start = datetime(year, month, day)
+        return start, start + timedelta(days=1)
+    except ValueError:
+        return None
+
+
+def parse_news_time(time_str, now=None):
+    """
+    把百度新闻的时间字符串转换为绝对时间
+
+    Args:
+        time_str (str): 时间字符串
+        now (datetime): 参照时间，默认为当前时间
+
+    Returns:
+        datetime: 最早可能的发布时间，无法识别时返回None
+    """
+    time_range = news_time_range(time_str, now)
+    return time_range[0] if time_range else None
+
+
+def parse_time_bound(value, now=None, end=False):
+    """
+    解析时间范围的边界
+
+    支持以下格式：
+    - datetime 对象
+    - ISO格式的日期或时间，如 2025-06-01、2025-06-01 12:00
+    - 简写的相对时间，如 30m、12h、7d（表示多久之前）
+    - 百度新闻风格的时间，如 今天、昨天、3小时前、6月1日
+
+    只精确到某个单位的时间（如 今天、2025-06-01）表示一个区间，
+    作为起始时间时取区间的开始，作为截止时间（end=True）时取区间的结束，
+    例如截止时间"今天"表示明天零点
+
+    Args:
+        value: 时间边界，为空时返回None
+        now (datetime): 参照时间，默认为当前时间
+        end (bool): 是否为截止时间
+
+    Returns:
+        datetime: 绝对时间
+
+    Raises:
+        ValueError: 无法识别的时间格式
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+
+    now = now or datetime.now()
+    value = str(value).strip()
+
+    match = SHORT_RELATIVE_PATTERN.match(value)
+    if match:
+        return now - SHORT_UNITS[match.group(2).lower()] * int(match.group(1))
+
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    else:
+        # 只有日期时表示一整天
+        if end and len(value) <= 10:
+            return moment + timedelta(days=1)
+        return moment
+
+    time_range = news_time_range(value, now)
+    if time_range is None:
+        raise ValueError(f"无法识别的时间: {value}")
+    return time_range[1] if end else time_range[0]
+
+
+def filter_by_time(results, since=None, until=None, now=None):
+    """
+    按时间范围过滤搜索结果
+
+    时间未知的结果无法判断，予以保留
+
+    Args:
+        results (list): 搜索结果列表
+        since (datetime): 起始时间
+        until (datetime): 截止时间
+        now (datetime): 解析模糊时间的参照时间
+
+    Returns:
+        tuple: (范围内的结果列表, 是否所有时间已知的结果都早于起始时间)
+    """
+    if since is None and until is None:
+        return results, False
+
+    kept = []
+    known = 0
+    older = 0
+    for item in results:
+        time_range = news_time_range(item.get('time', ''), now)
+        if time_range is None:
+            kept.append(item)
+            continue
+
+        start, end = time_range
+        known += 1
+        if since is not None and end <= since:
+            older += 1
+            continue
+        if until is not None and start > until:
+            continue
+        kept.append(item)
+
+    return kept, known > 0 and older == known
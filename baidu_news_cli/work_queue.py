@@ -0,0 +1,708 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分布式抓取工作队列模块
+多个主机或进程上的 BaiduNewsSearcher 工作进程从共享队列中领取 (关键词, 页码) 任务，
+任务中同时记录时间范围和排序方式，支持任务租约、失败重试、任务去重和全局请求速率限制，
+结果合并写入同一个存储。
+
+提供两种队列实现：
+- SQLiteWorkQueue: 基于本地SQLite文件，适合单机多进程；使用WAL模式，不能放在网络文件系统上
+- RedisWorkQueue: 基于Redis兼容的服务，适合多台主机；也可以传入本地替身客户端（如fakeredis）测试
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from datetime import datetime
+
+# 任务状态
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Redis队列的Lua脚本：每个操作在服务端原子执行，工作进程在任意时刻崩溃都不会丢失任务
+
+# 登记任务并加入等待队列
+# KEYS: tasks, status, pending    ARGV: task_id, 任务JSON
+REDIS_ENQUEUE_SCRIPT = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], 'pending')
+redis.call('LPUSH', KEYS[3], ARGV[1])
+return 1
+"""
+
+# 把租约过期的任务放回队列（或标记为失败），然后领取一个任务
+# 租约时间以Redis服务器的时钟为准，各主机之间的时钟偏差不会让租约提前过期
+# KEYS: pending, leases, attempts, owners, status, tasks, errors
+# ARGV: 租约时长（秒）, worker_id, 最大尝试次数
+REDIS_LEASE_SCRIPT = """
+-- Redis 5 之前的版本需要按命令复制，脚本中才能在 TIME 之后写入
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+for _, expired in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], expired)
+    local attempts = tonumber(redis.call('HGET', KEYS[3], expired) or '0')
+    if attempts >= tonumber(ARGV[3]) then
+        redis.call('HSET', KEYS[5], expired, 'failed')
+        redis.call('HSET', KEYS[7], expired, '租约过期次数过多')
+    else
+        redis.call('HSET', KEYS[5], expired, 'pending')
+        redis.call('LPUSH', KEYS[1], expired)
+    end
+end
+
+local task_id = redis.call('RPOP', KEYS[1])
+if not task_id then
+    return nil
+end
+local attempts = redis.call('HINCRBY', KEYS[3], task_id, 1)
+redis.call('HSET', KEYS[4], task_id, ARGV[2])
+redis.call('HSET', KEYS[5], task_id, 'leased')
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[1]), task_id)
+return {task_id, attempts, redis.call('HGET', KEYS[6], task_id)}
+"""
+
+# 提交结果：只有仍持有租约的工作进程才能提交
+# KEYS: owners, leases, status, results    ARGV: task_id, worker_id, 去重键1, 结果1, 去重键2, 结果2, ...
+REDIS_COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] or redis.call('ZREM', KEYS[2], ARGV[1]) == 0 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HSETNX', KEYS[4], ARGV[i], ARGV[i + 1])
+end
+redis.call('HSET', KEYS[3], ARGV[1], 'done')
+return 1
+"""
+
+# 报告失败：只有仍持有租约的工作进程才能报告，未超过最大尝试次数时重新入队
+# KEYS: owners, leases, status, errors, pending    ARGV: task_id, worker_id, 错误信息, 是否放弃(1/0)
+REDIS_FAIL_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] or redis.call('ZREM', KEYS[2], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+if ARGV[4] == '1' then
+    redis.call('HSET', KEYS[3], ARGV[1], 'failed')
+else
+    redis.call('HSET', KEYS[3], ARGV[1], 'pending')
+    redis.call('LPUSH', KEYS[5], ARGV[1])
+end
+return 1
+"""
+
+
+def format_time(value):
+    """
+    把时间范围参数转换为任务中保存的ISO字符串
+
+    Args:
+        value (datetime): 时间，None表示不限制
+
+    Returns:
+        str: ISO格式的时间，未设置时返回None
+    """
+    return value.isoformat() if value else None
+
+
+def parse_time(value):
+    """
+    把任务中保存的ISO字符串还原为时间
+
+    Args:
+        value (str): ISO格式的时间，None表示不限制
+
+    Returns:
+        datetime: 时间，未设置时返回None
+    """
+    return datetime.fromisoformat(value) if value else None
+
+
+def make_task_id(keyword, page, since=None, until=None, sort=None):
+    """
+    根据关键词、页码、时间范围和排序方式生成任务ID，相同的任务只会入队一次；
+    时间范围或排序方式不同的任务是不同的任务，为新的时间范围重新入队时会加入新任务
+
+    Args:
+        keyword (str): 搜索关键词
+        page (int): 页码
+        since (datetime): 起始时间
+        until (datetime): 截止时间
+        sort (str): 排序方式
+
+    Returns:
+        str: 任务ID
+    """
+    key = f"{keyword}\0{page}"
+    if since or until or sort:
+        # 未设置时间范围和排序方式的任务保持原来的ID
+        key += f"\0{format_time(since) or ''}\0{format_time(until) or ''}\0{sort or ''}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def make_result_key(item):
+    """
+    生成结果的去重键，不同任务抓到的同一篇新闻只保存一次
+
+    Args:
+        item (dict): 搜索结果
+
+    Returns:
+        str: 去重键
+    """
+    return item.get('url') or item.get('title', '')
+
+
+def default_worker_id():
+    """返回默认的工作进程ID：主机名-进程号"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SQLiteWorkQueue:
+    """基于SQLite的单机工作队列"""
+
+    def __init__(self, path, max_attempts=3):
+        """
+        打开（或创建）队列
+
+        Args:
+            path (str): SQLite数据库文件路径
+            max_attempts (int): 每个任务最多尝试的次数
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory if directory else '.', exist_ok=True)
+
+        self.path = path
+        self.max_attempts = max_attempts
+        # 手动管理事务，领取任务时用 BEGIN IMMEDIATE 加写锁
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY,"
+            " keyword TEXT NOT NULL,"
+            " page INTEGER NOT NULL,"
+            " since TEXT,"
+            " until TEXT,"
+            " sort TEXT,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_owner TEXT,"
+            " lease_expires REAL,"
+            " error TEXT,"
+            " created_at REAL NOT NULL)"
+        )
+        # 旧版本创建的队列没有时间范围和排序方式的列
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        for column in ("since", "until", "sort"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created_at)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " result_key TEXT PRIMARY KEY,"
+            " keyword TEXT,"
+            " page INTEGER,"
+            " data TEXT NOT NULL,"
+            " worker_id TEXT,"
+            " created_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_budget ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1),"
+            " rate REAL NOT NULL,"
+            " burst REAL NOT NULL,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "INSERT OR IGNORE INTO rate_budget (id, rate, burst, tokens, updated_at) VALUES (1, 1.0, 1.0, 1.0, ?)",
+            (time.time(),),
+        )
+
+    def enqueue(self, keyword, pages=1, since=None, until=None, sort=None):
+        """
+        把一个关键词的多页任务加入队列，已存在的任务被忽略
+
+        Args:
+            keyword (str): 搜索关键词
+            pages (int): 页数
+            since (datetime): 起始时间
+            until (datetime): 截止时间
+            sort (str): 排序方式
+
+        Returns:
+            int: 新加入的任务数
+        """
+        now = time.time()
+        rows = [
+            (make_task_id(keyword, page, since, until, sort), keyword, page,
+             format_time(since), format_time(until), sort, STATUS_PENDING, now)
+            for page in range(1, pages + 1)
+        ]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (task_id, keyword, page, since, until, sort, status, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def lease(self, worker_id, lease_seconds=120):
+        """
+        领取一个任务
+
+        等待中的任务和租约已过期的任务都可以被领取；
+        超过最大尝试次数的过期任务被标记为失败
+
+        Args:
+            worker_id (str): 工作进程ID
+            lease_seconds (float): 租约时长（秒），超时未完成的任务会被其他工作进程重新领取
+
+        Returns:
+            dict: 任务，包含task_id、keyword、page、since、until、sort、attempts；
+                  没有可领取的任务时返回None
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, error = COALESCE(error, '租约过期次数过多')"
+                " WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (STATUS_FAILED, STATUS_LEASED, now, self.max_attempts),
+            )
+            row = self.conn.execute(
+                "SELECT task_id, keyword, page, since, until, sort, attempts FROM tasks"
+                " WHERE status = ? OR (status = ? AND lease_expires < ?)"
+                " ORDER BY created_at, page LIMIT 1",
+                (STATUS_PENDING, STATUS_LEASED, now),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            task_id, keyword, page, since, until, sort, attempts = row
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?"
+                " WHERE task_id = ?",
+                (STATUS_LEASED, worker_id, now + lease_seconds, task_id),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return {"task_id": task_id, "keyword": keyword, "page": page,
+                "since": since, "until": until, "sort": sort, "attempts": attempts + 1}
+
+    def complete(self, task, worker_id, results):
+        """
+        提交任务结果
+
+        只有仍持有租约的工作进程才能提交，租约过期后被他人领取的任务提交无效
+
+        Args:
+            task (dict): lease 返回的任务
+            worker_id (str): 工作进程ID
+            results (list): 搜索结果列表
+
+        Returns:
+            bool: 提交是否生效
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = ?, lease_expires = NULL, error = NULL"
+                " WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (STATUS_DONE, task["task_id"], STATUS_LEASED, worker_id),
+            )
+            if cursor.rowcount == 0:
+                self.conn.execute("ROLLBACK")
+                return False
+
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO results (result_key, keyword, page, data, worker_id, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (make_result_key(item), task["keyword"], task["page"],
+                     json.dumps(item, ensure_ascii=False), worker_id, now)
+                    for item in results
+                ],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def fail(self, task, worker_id, error):
+        """
+        报告任务失败，未超过最大尝试次数时重新放回队列
+
+        Args:
+            task (dict): lease 返回的任务
+            worker_id (str): 工作进程ID
+            error (str): 错误信息
+        """
+        status = STATUS_FAILED if task["attempts"] >= self.max_attempts else STATUS_PENDING
+        self.conn.execute(
+            "UPDATE tasks SET status = ?, lease_expires = NULL, error = ?"
+            " WHERE task_id = ? AND status = ? AND lease_owner = ?",
+            (status, error, task["task_id"], STATUS_LEASED, worker_id),
+        )
+
+    def set_rate(self, rate, burst=None):
+        """
+        设置所有工作进程共享的请求速率
+
+        Args:
+            rate (float): 每秒允许的请求数
+            burst (float): 令牌桶容量，默认等于rate（至少为1）
+        """
+        burst = burst or max(1.0, rate)
+        self.conn.execute(
+            "UPDATE rate_budget SET rate = ?, burst = ?, tokens = MIN(tokens, ?) WHERE id = 1",
+            (rate, burst, burst),
+        )
+
+    def acquire_rate(self):
+        """阻塞直到从全局令牌桶中取得一次请求的配额"""
+        while True:
+            now = time.time()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rate, burst, tokens, updated_at = self.conn.execute(
+                    "SELECT rate, burst, tokens, updated_at FROM rate_budget WHERE id = 1"
+                ).fetchone()
+                tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+                granted = tokens >= 1
+                if granted:
+                    tokens -= 1
+                self.conn.execute(
+                    "UPDATE rate_budget SET tokens = ?, updated_at = ? WHERE id = 1", (tokens, now)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+            if granted:
+                return
+            time.sleep((1 - tokens) / rate if rate > 0 else 1.0)
+
+    def stats(self):
+        """
+        统计各状态的任务数和结果数
+
+        Returns:
+            dict: 状态 -> 任务数，另含 results 表示已合并的结果数
+        """
+        stats = {status: 0 for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)}
+        stats.update(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"))
+        stats["results"] = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return stats
+
+    def iter_results(self):
+        """依次产出合并后的结果"""
+        for data, keyword, page in self.conn.execute(
+            "SELECT data, keyword, page FROM results ORDER BY keyword, page, created_at"
+        ):
+            item = json.loads(data)
+            item['keyword'] = keyword
+            item['page'] = page
+            yield item
+
+    def close(self):
+        """关闭队列"""
+        self.conn.close()
+
+
+class RedisWorkQueue:
+    """基于Redis兼容服务的共享工作队列"""
+
+    def __init__(self, client, prefix="baidu_news", max_attempts=3):
+        """
+        初始化队列
+
+        Args:
+            client: redis-py 兼容的客户端，如 redis.Redis 或本地替身 fakeredis.FakeRedis
+                    （替身需要支持Lua脚本，fakeredis需要安装 lupa）
+            prefix (str): 键名前缀，不同的抓取任务可以使用不同的前缀
+            max_attempts (int): 每个任务最多尝试的次数
+        """
+        self.client = client
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+
+        self._enqueue_script = client.register_script(REDIS_ENQUEUE_SCRIPT)
+        self._lease_script = client.register_script(REDIS_LEASE_SCRIPT)
+        self._complete_script = client.register_script(REDIS_COMPLETE_SCRIPT)
+        self._fail_script = client.register_script(REDIS_FAIL_SCRIPT)
+
+    def _key(self, name):
+        """返回带前缀的键名，前缀用{}包围，使Redis集群把同一队列的键分配到同一个槽"""
+        return f"{{{self.prefix}}}:{name}"
+
+    @staticmethod
+    def _text(value):
+        """把Redis返回的bytes转换为str"""
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def enqueue(self, keyword, pages=1, since=None, until=None, sort=None):
+        """
+        把一个关键词的多页任务加入队列，已存在的任务被忽略
+
+        Args:
+            keyword (str): 搜索关键词
+            pages (int): 页数
+            since (datetime): 起始时间
+            until (datetime): 截止时间
+            sort (str): 排序方式
+
+        Returns:
+            int: 新加入的任务数
+        """
+        keys = [self._key("tasks"), self._key("status"), self._key("pending")]
+        added = 0
+        for page in range(1, pages + 1):
+            task = json.dumps({
+                "keyword": keyword, "page": page,
+                "since": format_time(since), "until": format_time(until), "sort": sort,
+            }, ensure_ascii=False)
+            added += self._enqueue_script(keys=keys, args=[make_task_id(keyword, page, since, until, sort), task])
+        return added
+
+    def lease(self, worker_id, lease_seconds=120):
+        """
+        领取一个任务
+
+        Args:
+            worker_id (str): 工作进程ID
+            lease_seconds (float): 租约时长（秒）
+
+        Returns:
+            dict: 任务，没有可领取的任务时返回None
+        """
+        keys = [self._key(name) for name in ("pending", "leases", "attempts", "owners", "status", "tasks", "errors")]
+        leased = self._lease_script(keys=keys, args=[repr(float(lease_seconds)), worker_id, self.max_attempts])
+        if not leased:
+            return None
+
+        task_id, attempts, task = leased
+        task = json.loads(self._text(task))
+        task.update({"task_id": self._text(task_id), "attempts": int(attempts)})
+        return task
+
+    def complete(self, task, worker_id, results):
+        """
+        提交任务结果
+
+        Args:
+            task (dict): lease 返回的任务
+            worker_id (str): 工作进程ID
+            results (list): 搜索结果列表
+
+        Returns:
+            bool: 提交是否生效
+        """
+        args = [task["task_id"], worker_id]
+        for item in results:
+            item = dict(item, keyword=task["keyword"], page=task["page"])
+            args.extend([make_result_key(item), json.dumps(item, ensure_ascii=False)])
+        keys = [self._key(name) for name in ("owners", "leases", "status", "results")]
+        return bool(self._complete_script(keys=keys, args=args))
+
+    def fail(self, task, worker_id, error):
+        """
+        报告任务失败，未超过最大尝试次数时重新放回队列
+
+        Args:
+            task (dict): lease 返回的任务
+            worker_id (str): 工作进程ID
+            error (str): 错误信息
+        """
+        give_up = 1 if task["attempts"] >= self.max_attempts else 0
+        keys = [self._key(name) for name in ("owners", "leases", "status", "errors", "pending")]
+        self._fail_script(keys=keys, args=[task["task_id"], worker_id, error, give_up])
+
+    def set_rate(self, rate, burst=None):
+        """
+        设置所有工作进程共享的请求速率
+
+        Args:
+            rate (float): 每秒允许的请求数
+            burst (float): 未使用，与 SQLiteWorkQueue 保持相同的接口
+        """
+        self.client.hset(self._key("config"), "rate", rate)
+
+    def acquire_rate(self):
+        """阻塞直到取得一次请求的配额（固定窗口计数）"""
+        while True:
+            rate = float(self.client.hget(self._key("config"), "rate") or 1.0)
+            # 速率低于每秒一次时使用更长的窗口，每个窗口至少允许一次请求
+            window_seconds = max(1.0, 1.0 / rate) if rate > 0 else 1.0
+            quota = max(1, int(rate * window_seconds))
+
+            # 以Redis服务器的时钟划分窗口，所有主机使用同一个窗口
+            seconds, microseconds = self.client.time()
+            now = seconds + microseconds / 1000000
+            window = int(now // window_seconds)
+            key = self._key(f"rate:{window}")
+            count = self.client.incr(key)
+            if count == 1:
+                self.client.expire(key, int(window_seconds * 2) + 1)
+            if count <= quota:
+                return
+            time.sleep((window + 1) * window_seconds - now)
+
+    def stats(self):
+        """
+        统计各状态的任务数和结果数
+
+        Returns:
+            dict: 状态 -> 任务数，另含 results 表示已合并的结果数
+        """
+        stats = {status: 0 for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)}
+        for status in self.client.hvals(self._key("status")):
+            status = self._text(status)
+            stats[status] = stats.get(status, 0) + 1
+        stats["results"] = self.client.hlen(self._key("results"))
+        return stats
+
+    def iter_results(self):
+        """依次产出合并后的结果"""
+        for data in self.client.hvals(self._key("results")):
+            yield json.loads(self._text(data))
+
+    def close(self):
+        """关闭队列"""
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+
+def open_work_queue(url, max_attempts=3):
+    """
+    根据地址打开工作队列
+
+    Args:
+        url (str): redis://... 或 rediss://... 使用Redis，其他值视为SQLite文件路径
+                   （可带 sqlite:/// 前缀）
+        max_attempts (int): 每个任务最多尝试的次数
+
+    Returns:
+        SQLiteWorkQueue 或 RedisWorkQueue
+    """
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("使用Redis队列需要安装 redis: pip install redis")
+        return RedisWorkQueue(redis.Redis.from_url(url), max_attempts=max_attempts)
+
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteWorkQueue(url, max_attempts=max_attempts)
+
+
+def run_worker(work_queue, searcher, worker_id=None, lease_seconds=120, poll_interval=2.0,
+               exit_when_idle=True):
+    """
+    工作进程主循环：领取任务、按全局速率抓取、提交结果
+
+    每次搜索请求（包括搜索器内部的重试）都会从全局速率预算中取得一次配额，
+    任务的时间范围和排序方式取自任务本身
+
+    Args:
+        work_queue: SQLiteWorkQueue 或 RedisWorkQueue
+        searcher (BaiduNewsSearcher): 搜索器实例，运行期间它的 before_request 被替换为取得配额
+        worker_id (str): 工作进程ID，默认为 主机名-进程号
+        lease_seconds (float): 任务租约时长（秒）
+        poll_interval (float): 没有可领取的任务时的轮询间隔（秒）
+        exit_when_idle (bool): 队列中没有等待中和进行中的任务时退出
+
+    Returns:
+        dict: 本工作进程的统计，包含 done、failed、results
+    """
+    worker_id = worker_id or default_worker_id()
+    stats = {"done": 0, "failed": 0, "results": 0}
+    has_quota = False
+
+    def acquire_quota():
+        """搜索器发送请求前调用：优先使用领取任务前已取得的配额"""
+        nonlocal has_quota
+        if has_quota:
+            has_quota = False
+        else:
+            work_queue.acquire_rate()
+
+    before_request = searcher.before_request
+    searcher.before_request = acquire_quota
+    try:
+        while True:
+            # 先取得第一次请求的配额再领取任务，等待配额的时间不会占用租约；
+            # 没有领到任务时保留配额，供下一个任务使用
+            if not has_quota:
+                work_queue.acquire_rate()
+                has_quota = True
+
+            task = work_queue.lease(worker_id, lease_seconds=lease_seconds)
+            if task is None:
+                queue_stats = work_queue.stats()
+                if exit_when_idle and queue_stats[STATUS_PENDING] == 0 and queue_stats[STATUS_LEASED] == 0:
+                    return stats
+                time.sleep(poll_interval)
+                continue
+
+            _run_task(work_queue, searcher, worker_id, task, stats)
+    finally:
+        searcher.before_request = before_request
+
+
+def _run_task(work_queue, searcher, worker_id, task, stats):
+    """
+    执行一个已领取的任务并提交结果或报告失败
+
+    Args:
+        work_queue: SQLiteWorkQueue 或 RedisWorkQueue
+        searcher (BaiduNewsSearcher): 搜索器实例
+        worker_id (str): 工作进程ID
+        task (dict): lease 返回的任务
+        stats (dict): 本工作进程的统计，原地更新
+    """
+    try:
+        results = searcher.search(
+            task["keyword"], page=task["page"],
+            since=parse_time(task.get("since")), until=parse_time(task.get("until")), sort=task.get("sort"),
+        )
+    except Exception as e:
+        work_queue.fail(task, worker_id, str(e))
+        stats["failed"] += 1
+        print(f"任务失败 [{task['keyword']} 第{task['page']}页 第{task['attempts']}次]: {str(e)}")
+        return
+
+    if work_queue.complete(task, worker_id, results):
+        stats["done"] += 1
+        stats["results"] += len(results)
+    else:
+        print(f"任务租约已过期，结果被丢弃: {task['keyword']} 第{task['page']}页")
@@ -4,12 +4,21 @@
 """
 百度新闻MCP服务器
 提供百度新闻搜索功能的MCP服务器，可以被智能助手调用
+
+默认通过stdio运行；使用 --transport streamable-http 或 sse 时作为网络服务运行，
+多个智能助手可以共享同一个服务进程的缓存和连接池
 """
 
 import os
 import sys
 import json
+import argparse
+import functools
 from typing import List, Dict, Optional
+
+import anyio
+import uvicorn
+from requests.adapters import HTTPAdapter
 from mcp.server.fastmcp import FastMCP
 
 # 确保可以导入百度新闻搜索模块
@@ -26,21 +35,46 @@ mcp = FastMCP("百度新闻搜索服务")
 # 创建搜索器实例
 searcher = BaiduNewsSearcher(timeout=15, max_retries=3)
 
+# 同时执行的工具调用数，在 main() 中根据命令行参数设置
+pool_size = 16
+_limiter = None
+
+def _in_worker_pool(func):
+    """把同步的工具函数放到线程池中执行
+    
+    搜索和抓取都是阻塞的网络请求，直接在事件循环中执行会让其他请求排队等待；
+    放到有上限的线程池中执行后，多个智能助手的请求可以并发处理
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        global _limiter
+        if _limiter is None:
+            # CapacityLimiter 需要在事件循环中创建
+            _limiter = anyio.CapacityLimiter(pool_size)
+        return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_limiter)
+    return wrapper
+
 @mcp.tool()
-def search_news(keywords: str, page: int = 1, num: int = 10) -> str:
+@_in_worker_pool
+def search_news(keywords: str, page: int = 1, num: int = 10,
+                since: str = "", until: str = "", sort_by_time: bool = False) -> str:
     """搜索百度新闻
     
     Args:
         keywords: 搜索关键词
         page: 页码，默认为1
         num: 每页显示的结果数量，默认为10
+        since: 起始时间，如 "2025-06-01"、"24h"、"7d"、"今天"，默认不限
+        until: 截止时间，格式同 since，默认不限
+        sort_by_time: 是否按时间排序，默认按相关度排序
         
     Returns:
         搜索结果的JSON字符串
     """
     try:
         # 执行搜索
-        results = searcher.search(keywords, page=page)
+        results = searcher.search(keywords, page=page, since=since, until=until,
+                                  sort="time" if sort_by_time else None)
         
         # 限制结果数量
         results = results[:num]
@@ -54,20 +88,26 @@ def search_news(keywords: str, page: int = 1, num: int = 10) -> str:
         }, ensure_ascii=False)
 
 @mcp.tool()
-def get_news_details(keywords: str, page: int = 1, num: int = 10) -> str:
+@_in_worker_pool
+def get_news_details(keywords: str, page: int = 1, num: int = 10,
+                     since: str = "", until: str = "", sort_by_time: bool = False) -> str:
     """获取新闻详细信息
     
     Args:
         keywords: 搜索关键词
         page: 页码，默认为1
         num: 每页显示的结果数量，默认为10
+        since: 起始时间，如 "2025-06-01"、"24h"、"7d"、"今天"，默认不限
+        until: 截止时间，格式同 since，默认不限
+        sort_by_time: 是否按时间排序，默认按相关度排序
         
     Returns:
         格式化的新闻详情字符串
     """
     try:
         # 执行搜索
-        results = searcher.search(keywords, page=page)
+        results = searcher.search(keywords, page=page, since=since, until=until,
+                                  sort="time" if sort_by_time else None)
         
         # 限制结果数量
         results = results[:num]
@@ -91,13 +131,18 @@ def get_news_details(keywords: str, page: int = 1, num: int = 10) -> str:
         return f"获取新闻详情时出错: {str(e)}"
 
 @mcp.tool()
-def search_news_by_topic(topic: str, page: int = 1, num: int = 10) -> str:
+@_in_worker_pool
+def search_news_by_topic(topic: str, page: int = 1, num: int = 10,
+                         since: str = "", until: str = "", sort_by_time: bool = False) -> str:
     """按主题搜索百度新闻
     
     Args:
         topic: 新闻主题（如科技、体育、财经等）
         page: 页码，默认为1
         num: 每页显示的结果数量，默认为10
+        since: 起始时间，如 "2025-06-01"、"24h"、"7d"、"今天"，默认不限
+        until: 截止时间，格式同 since，默认不限
+        sort_by_time: 是否按时间排序，默认按相关度排序
         
     Returns:
         格式化的新闻详情字符串
@@ -121,7 +166,8 @@ def search_news_by_topic(topic: str, page: int = 1, num: int = 10) -> str:
     
     try:
         # 执行搜索
-        results = searcher.search(keywords, page=page)
+        results = searcher.search(keywords, page=page, since=since, until=until,
+                                  sort="time" if sort_by_time else None)
         
         # 限制结果数量
         results = results[:num]
@@ -144,6 +190,138 @@ def search_news_by_topic(topic: str, page: int = 1, num: int = 10) -> str:
     except Exception as e:
         return f"获取{topic}新闻时出错: {str(e)}"
 
+@mcp.tool()
+@_in_worker_pool
+def fetch_articles(urls: List[str], max_chars: int = 5000) -> str:
+    """抓取新闻正文
+    
+    搜索结果中的摘要是截断的，需要阅读全文时使用此工具
+    
+    Args:
+        urls: 新闻链接列表
+        max_chars: 每篇正文最多返回的字符数，默认为5000
+        
+    Returns:
+        包含标题、正文的JSON字符串
+    """
+    try:
+        articles = searcher.fetch_articles(urls)
+        
+        # 限制正文长度
+        output = []
+        for article in articles:
+            item = {
+                "url": article["url"],
+                "final_url": article["final_url"],
+                "title": article["title"],
+                "text": article["text"][:max_chars],
+            }
+            if article["error"]:
+                item["error"] = article["error"]
+            output.append(item)
+        
+        return json.dumps(output, ensure_ascii=False, indent=2)
+    except Exception as e:
+        return json.dumps({
+            "error": True,
+            "message": f"抓取新闻正文时出错: {str(e)}"
+        }, ensure_ascii=False)
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="百度新闻搜索MCP服务器")
+    
+    parser.add_argument(
+        "-t", "--transport",
+        choices=["stdio", "sse", "streamable-http"],
+        default="stdio",
+        help="传输方式 (默认: stdio)"
+    )
+    
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="网络模式的监听地址 (默认: 127.0.0.1)"
+    )
+    
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=6278,
+        help="网络模式的监听端口 (默认: 6278)"
+    )
+    
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=16,
+        help="同时执行的工具调用数，同时也是到每个主机的连接池大小 (默认: 16)"
+    )
+    
+    parser.add_argument(
+        "--stateless",
+        action="store_true",
+        help="streamable-http 模式下不保存会话状态，便于在负载均衡后面部署多个服务进程"
+    )
+    
+    parser.add_argument(
+        "--resolve-links",
+        action="store_true",
+        help="把搜索结果中的百度跳转链接解析为最终的文章地址"
+    )
+    
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=10,
+        help="收到退出信号后等待进行中的请求完成的最长时间(秒) (默认: 10)"
+    )
+    
+    return parser.parse_args()
+
+def main():
+    """启动服务器"""
+    global pool_size
+    
+    args = parse_arguments()
+    pool_size = max(1, args.pool_size)
+    searcher.resolve_links = args.resolve_links
+    
+    if args.transport == "stdio":
+        # 初始化并运行服务器
+        mcp.run()
+        return
+    
+    # 网络模式下多个请求共享同一个搜索器，扩大连接池以匹配并发数
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    searcher.session.mount("http://", adapter)
+    searcher.session.mount("https://", adapter)
+    
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    if args.transport == "streamable-http":
+        mcp.settings.stateless_http = args.stateless
+        app = mcp.streamable_http_app()
+        path = mcp.settings.streamable_http_path
+    else:
+        app = mcp.sse_app()
+        path = mcp.settings.sse_path
+    
+    print(f"百度新闻MCP服务已启动: http://{args.host}:{args.port}{path} ({args.transport})", file=sys.stderr)
+    
+    # uvicorn 收到 SIGINT/SIGTERM 后停止接受新连接，并等待进行中的请求完成
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=mcp.settings.log_level.lower(),
+    )
+    try:
+        uvicorn.Server(config).run()
+    finally:
+        searcher.close()
+        print("百度新闻MCP服务已关闭", file=sys.stderr)
+
 if __name__ == "__main__":
-    # 初始化并运行服务器
-    mcp.run()
\ No newline at end of file
+    main()
\ No newline at end of file
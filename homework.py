@@ -7,7 +7,11 @@
 """
 
 import os
+import json
+import time
 import asyncio
+import threading
+from collections import OrderedDict
 from typing import Optional
 # import dashscope
 from qwen_agent.agents import Assistant
@@ -16,6 +20,153 @@ from qwen_agent.gui import WebUI
 # dashscope.api_key = os.getenv('DASHSCOPE_API_KEY', '')  # 从环境变量获取 API Key
 # dashscope.timeout = 30  # 设置超时时间为 30 秒
 
+# 工具调用结果的缓存时间（秒）
+TOOL_CACHE_TTL = 600
+# 最多缓存的工具调用数
+TOOL_CACHE_SIZE = 256
+# 对话历史的字符数超过该值时压缩旧的工具结果
+HISTORY_BUDGET_CHARS = 12000
+# 最近的若干条消息保持原样，不压缩
+KEEP_RECENT_MESSAGES = 6
+# 压缩后每条工具结果保留的字符数
+TOOL_SUMMARY_CHARS = 200
+# 已压缩的工具结果的结尾标记，带有该标记的结果不再重复压缩
+COMPACTED_MARKER = '[较早的工具结果已压缩'
+
+# 表示工具调用失败的结果，不缓存
+TOOL_ERROR_MARKERS = ('An error occurred', '"error": true', '时出错:')
+
+
+class ToolCallMemo:
+    """工具调用结果缓存
+    
+    以 (工具名, 参数) 为键缓存工具的返回结果，在有效期内重复的调用直接返回缓存，
+    不再请求 MCP 服务
+    """
+    
+    def __init__(self, ttl=TOOL_CACHE_TTL, max_entries=TOOL_CACHE_SIZE):
+        """初始化缓存
+        
+        Args:
+            ttl: 缓存有效期（秒）
+            max_entries: 最多缓存的调用数，超出时淘汰最久未使用的调用
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(tool_name, tool_args):
+        """生成缓存键，参数为JSON时按键名排序，使参数顺序不同的相同调用命中同一缓存
+        
+        Args:
+            tool_name: 工具名
+            tool_args: 工具参数，JSON字符串或字典
+        
+        Returns:
+            缓存键
+        """
+        if isinstance(tool_args, str):
+            try:
+                tool_args = json.loads(tool_args)
+            except ValueError:
+                return tool_name, tool_args
+        return tool_name, json.dumps(tool_args, ensure_ascii=False, sort_keys=True)
+    
+    def get(self, key):
+        """读取缓存，过期或不存在时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key, result):
+        """写入缓存"""
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class MemoAssistant(Assistant):
+    """带工具调用缓存的助手
+    
+    重复的问题往往会触发完全相同的工具调用（如同样关键词的新闻搜索），
+    命中缓存时直接返回之前的结果
+    """
+    
+    def __init__(self, *args, tool_memo: Optional[ToolCallMemo] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tool_memo = tool_memo or ToolCallMemo()
+    
+    def _call_tool(self, tool_name, tool_args='{}', **kwargs):
+        key = self.tool_memo.make_key(tool_name, tool_args)
+        cached = self.tool_memo.get(key)
+        if cached is not None:
+            print(f"工具调用命中缓存: {tool_name}")
+            return cached
+        
+        result = super()._call_tool(tool_name, tool_args, **kwargs)
+        # 只缓存成功的文本结果
+        if isinstance(result, str) and not any(marker in result[:200] for marker in TOOL_ERROR_MARKERS):
+            self.tool_memo.put(key, result)
+        return result
+
+
+def _content_length(message):
+    """计算一条消息内容的字符数"""
+    content = message.get('content', '')
+    if isinstance(content, str):
+        return len(content)
+    return sum(len(item.get('text', '')) for item in content if isinstance(item, dict))
+
+
+def _is_compacted(content, summary_chars):
+    """判断工具结果是否已经被压缩过：压缩后的结果在摘要之后紧跟标记"""
+    return content.startswith(f"...{COMPACTED_MARKER}", summary_chars)
+
+
+def compact_history(messages, budget_chars=HISTORY_BUDGET_CHARS, keep_recent=KEEP_RECENT_MESSAGES,
+                    summary_chars=TOOL_SUMMARY_CHARS):
+    """压缩对话历史
+    
+    历史的总字符数超过预算时，把较早的工具结果替换为简短的摘要，
+    使每轮发送给模型的内容长度保持稳定；用户和助手的消息、最近的消息以及已经压缩过的结果保持原样
+    
+    Args:
+        messages: 对话历史
+        budget_chars: 字符数预算
+        keep_recent: 保持原样的最近消息数
+        summary_chars: 每条工具结果压缩后保留的字符数
+    
+    Returns:
+        压缩后的对话历史（新列表，不修改传入的消息）
+    """
+    total = sum(_content_length(message) for message in messages)
+    if total <= budget_chars:
+        return messages
+    
+    compacted = []
+    boundary = max(0, len(messages) - keep_recent)
+    for index, message in enumerate(messages):
+        content = message.get('content', '')
+        if (index < boundary and message.get('role') == 'function'
+                and isinstance(content, str) and len(content) > summary_chars
+                and not _is_compacted(content, summary_chars)):
+            message = dict(message)
+            message['content'] = f"{content[:summary_chars]}...{COMPACTED_MARKER}，原长度 {len(content)} 字]"
+        compacted.append(message)
+    return compacted
+
 def init_agent_service():
     """初始化文本计数助手服务
     
@@ -62,6 +213,11 @@ def init_agent_service():
                 "args": [r"C:\Users\nayun\Desktop\11-MCP与A2A的应用\baidu_news_mcp.py"],
                 "port": 6278
             }
+            # 如果已经用 python baidu_news_mcp.py -t sse 启动了共享的网络服务，可以改为：
+            # "baidu-news": {
+            #     "type": "sse",
+            #     "url": "http://127.0.0.1:6278/sse"
+            # }
             
 
         }
@@ -69,7 +225,7 @@ def init_agent_service():
     
     try:
         # 创建助手实例
-        bot = Assistant(
+        bot = MemoAssistant(
             llm=llm_cfg,
             name='智能助手',
             description='非常有用的智能助手',
@@ -143,6 +299,9 @@ def app_tui():
                 else:
                     messages.append({'role': 'user', 'content': [{'text': query}, {'file': file}]})
 
+                # 历史过长时压缩旧的工具结果，保持每轮的请求长度稳定
+                messages = compact_history(messages)
+
                 print("正在处理您的请求...")
                 # 运行助手并处理响应
                 response = []
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文本计数助手的测试
+覆盖工具调用缓存和对话历史压缩（未安装 qwen_agent 及其界面依赖时跳过）
+"""
+
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 确保可以导入项目模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import homework
+except ImportError:
+    homework = None
+
+
+@unittest.skipIf(homework is None, "需要安装 qwen_agent 及其界面依赖")
+class ToolCallMemoTest(unittest.TestCase):
+
+    def test_argument_order_does_not_matter(self):
+        make_key = homework.ToolCallMemo.make_key
+        self.assertEqual(make_key("search", '{"q": "ai", "page": 1}'), make_key("search", {"page": 1, "q": "ai"}))
+        self.assertNotEqual(make_key("search", '{"q": "ai"}'), make_key("search", '{"q": "ml"}'))
+        # 不是JSON的参数按原样作为键
+        self.assertEqual(make_key("search", "not json"), ("search", "not json"))
+
+    def test_expired_entry_is_dropped(self):
+        memo = homework.ToolCallMemo(ttl=10)
+        with mock.patch.object(homework.time, "time", return_value=100):
+            memo.put("k", "v")
+        with mock.patch.object(homework.time, "time", return_value=105):
+            self.assertEqual(memo.get("k"), "v")
+        with mock.patch.object(homework.time, "time", return_value=111):
+            self.assertIsNone(memo.get("k"))
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        memo = homework.ToolCallMemo(max_entries=2)
+        memo.put("a", "1")
+        memo.put("b", "2")
+        memo.get("a")
+        memo.put("c", "3")
+        self.assertIsNone(memo.get("b"))
+        self.assertEqual((memo.get("a"), memo.get("c")), ("1", "3"))
+
+    def test_assistant_caches_successful_results_only(self):
+        assistant = homework.MemoAssistant.__new__(homework.MemoAssistant)
+        assistant.tool_memo = homework.ToolCallMemo()
+        results = iter(['{"news": []}', 'An error occurred', 'An error occurred'])
+
+        with mock.patch.object(homework.Assistant, "_call_tool", side_effect=lambda *args, **kwargs: next(results)) as call:
+            self.assertEqual(assistant._call_tool("search", '{"q": "ai"}'), '{"news": []}')
+            self.assertEqual(assistant._call_tool("search", '{ "q" : "ai" }'), '{"news": []}')
+            self.assertEqual(call.call_count, 1)
+
+            # 失败的结果不缓存，下一次重新调用
+            assistant._call_tool("search", '{"q": "ml"}')
+            assistant._call_tool("search", '{"q": "ml"}')
+            self.assertEqual(call.call_count, 3)
+
+
+@unittest.skipIf(homework is None, "需要安装 qwen_agent 及其界面依赖")
+class CompactHistoryTest(unittest.TestCase):
+
+    def make_history(self, rounds, result_chars=1000):
+        messages = []
+        for i in range(rounds):
+            messages.append({'role': 'user', 'content': f'问题{i}'})
+            messages.append({'role': 'function', 'name': 'search', 'content': json.dumps({'i': i}) + '字' * result_chars})
+            messages.append({'role': 'assistant', 'content': f'回答{i}'})
+        return messages
+
+    def test_short_history_is_unchanged(self):
+        messages = self.make_history(2, result_chars=10)
+        self.assertIs(homework.compact_history(messages), messages)
+
+    def test_old_tool_results_are_compacted(self):
+        messages = self.make_history(6)
+        compacted = homework.compact_history(messages, budget_chars=2000, keep_recent=3, summary_chars=50)
+
+        self.assertEqual(len(compacted), len(messages))
+        for index, (before, after) in enumerate(zip(messages, compacted)):
+            if before['role'] == 'function' and index < len(messages) - 3:
+                self.assertTrue(after['content'].startswith(before['content'][:50]))
+                self.assertIn(f"原长度 {len(before['content'])} 字", after['content'])
+            else:
+                self.assertIs(after, before)
+        # 不修改传入的消息
+        self.assertGreater(len(messages[1]['content']), 1000)
+
+    def test_compacted_results_are_not_compacted_again(self):
+        messages = self.make_history(6)
+        options = {'budget_chars': 500, 'keep_recent': 3, 'summary_chars': 50}
+        once = homework.compact_history(messages, **options)
+        twice = homework.compact_history(once + self.make_history(2, result_chars=10), **options)
+
+        # 第一次已经压缩过的结果保持不变，原长度仍是压缩前的长度
+        for index in range(len(once) - 3):
+            self.assertEqual(twice[index]['content'], once[index]['content'])
+        self.assertIn(f"原长度 {len(messages[1]['content'])} 字", twice[1]['content'])
+        # 第一次保持原样的最近消息在第二次被压缩
+        self.assertIn(homework.COMPACTED_MARKER, twice[len(once) - 2]['content'])
+
+
+if __name__ == "__main__":
+    unittest.main()